@@ -0,0 +1,350 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import webbrowser
+
+from dev_starter import launcher
+
+# --- Launch benchmark ---
+# Measures how long 'dev-starter install-and-run' (or 'run') takes from start
+# to the browser-open call. 'npm run dev' is replaced by a stub dev server (this script with --stub)
+# that can simulate a slow startup, a slow first response or a server that
+# prints its banner before it binds the port. Each scenario runs many times and
+# the results are written as JSON with percentiles, so runs can be compared.
+#
+#   python bench.py                          # all scenarios, 10 runs each, JSON to stdout
+#   python bench.py -n 30 -o bench.json      # more runs, save the results
+#   python bench.py --compare bench.json     # ... and compare them with an earlier run
+#   python bench.py --scenario slow-start --subcommand run
+
+# Stub server behaviour per scenario (all values in seconds):
+#   startup_delay:         time before the server binds its port and prints its banner
+#   first_response_delay:  extra time the very first HTTP request takes (e.g. Vite's first transform)
+#   late_bind:             banner is printed immediately, but the port is only bound this much later
+SCENARIOS = {
+    "instant": {"startup_delay": 0, "first_response_delay": 0, "late_bind": 0},
+    "slow-start": {"startup_delay": 1.5, "first_response_delay": 0, "late_bind": 0},
+    "slow-first-response": {"startup_delay": 0.2, "first_response_delay": 1.0, "late_bind": 0},
+    "late-bind": {"startup_delay": 0, "first_response_delay": 0, "late_bind": 1.0},
+}
+
+# Phases reported for every run, as milliseconds since the launcher was called.
+# page_load is when the benchmark, acting as the browser, got the page the
+# launcher opened; a run only counts as successful if that worked.
+PHASES = ["install_check", "spawn", "first_listen", "first_response", "browser_open", "page_load"]
+
+PERCENTILES = [50, 90, 95, 99]
+
+# Environment variable telling the stub server where to record its events
+EVENTS_ENV = "DEV_STARTER_BENCH_EVENTS"
+
+# How long a single launch may take before it counts as failed (in seconds)
+RUN_TIMEOUT = 20
+
+# ---------------------
+
+class BrowserOpened(Exception):
+    """
+    Raised by the patched webbrowser.open_new_tab to end a run as soon as the
+    launcher tries to open the browser (skips its closing pause).
+    """
+
+def record_event(events_path, event):
+    """
+    Appends a timestamped event line for the benchmark (stub server side).
+    """
+    if events_path:
+        with open(events_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"event": event, "t": time.time()}) + "\n")
+
+def run_stub_server(port, startup_delay, first_response_delay, late_bind):
+    """
+    A stand-in for 'npm run dev': prints a Vite-style banner and serves a tiny page.
+    """
+    import http.server # Only needed in stub mode
+
+    events_path = os.environ.get(EVENTS_ENV)
+    banner = f"\n  STUB v1.0.0  ready\n\n  ➜  Local:   http://localhost:{port}/\n"
+    state = {"first": True}
+    lock = threading.Lock()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def respond(self, send_body):
+            with lock:
+                first, state["first"] = state["first"], False
+            if first and first_response_delay:
+                time.sleep(first_response_delay)
+            body = b"<!doctype html><html><head><script type=\"module\" src=\"/src/main.js\"></script></head><body></body></html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+            if first:
+                record_event(events_path, "first_response")
+
+        def do_GET(self):
+            self.respond(True)
+
+        def do_HEAD(self):
+            self.respond(False)
+
+        def log_message(self, format, *args):
+            pass
+
+    time.sleep(startup_delay)
+    if late_bind:
+        print(banner, flush=True)
+        time.sleep(late_bind)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    record_event(events_path, "first_listen")
+    if not late_bind:
+        print(banner, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def find_free_port():
+    """
+    Returns a TCP port on 127.0.0.1 that is currently free.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(values, pct):
+    """
+    Returns the pct-th percentile of values (linear interpolation), or None.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def summarize(runs):
+    """
+    Returns {phase: {"p50": ..., "p90": ..., "min": ..., "max": ..., "mean": ..., "count": ...}}
+    over all successful runs.
+    """
+    summary = {}
+    for phase in PHASES:
+        values = [run[phase] for run in runs if run.get(phase) is not None]
+        if not values:
+            continue
+        stats = {f"p{pct}": round(percentile(values, pct), 2) for pct in PERCENTILES}
+        stats.update({
+            "min": round(min(values), 2),
+            "max": round(max(values), 2),
+            "mean": round(sum(values) / len(values), 2),
+            "count": len(values),
+        })
+        summary[phase] = stats
+    return summary
+
+def prepare_project(work_dir):
+    """
+    Creates a throw-away project whose dependencies count as installed already,
+    so the install phase measures the up-to-date check.
+    """
+    with open(os.path.join(work_dir, "package.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": "dev-starter-bench", "version": "1.0.0", "private": True, "scripts": {"dev": "stub"}}, f)
+    launcher.save_dependency_fingerprint(work_dir, launcher.compute_dependency_fingerprint(work_dir))
+
+def run_once(work_dir, scenario, install=True):
+    """
+    Runs the launcher once against a fresh stub server and returns the phase
+    timings in milliseconds (None for phases that didn't happen).
+    """
+    port = find_free_port()
+    events_path = os.path.join(work_dir, "events.jsonl")
+    if os.path.exists(events_path):
+        os.remove(events_path)
+    os.environ[EVENTS_ENV] = events_path
+
+    stub_args = [
+        sys.executable, os.path.abspath(__file__), "--stub", "--port", str(port),
+        "--startup-delay", str(scenario["startup_delay"]),
+        "--first-response-delay", str(scenario["first_response_delay"]),
+        "--late-bind", str(scenario["late_bind"]),
+    ]
+    if platform.system() == "Windows":
+        launcher.DEV_COMMAND = subprocess.list2cmdline(stub_args)
+    else:
+        launcher.DEV_COMMAND = " ".join(shlex.quote(arg) for arg in stub_args)
+    launcher.LOCALHOST_PORT = port
+    launcher.SERVER_CHECK_TIMEOUT = RUN_TIMEOUT
+    launcher.REUSE_RUNNING_SERVER = False
+    launcher.HEADLESS = False
+    launcher.HEADLESS_FALLBACK = False # The terminal is replaced by spawn_in_background below
+
+    marks = {}
+    processes = []
+
+    def timed(name, function):
+        def wrapper(*args, **kwargs):
+            try:
+                return function(*args, **kwargs)
+            finally:
+                marks[name] = time.time()
+        return wrapper
+
+    def spawn_in_background(working_dir, terminal_command, npm_command="npm run dev"):
+        # Instead of a terminal window, run the command as a background process group
+        kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP} if platform.system() == "Windows" else {"start_new_session": True}
+        processes.append(subprocess.Popen(terminal_command, shell=True, cwd=working_dir, stdin=subprocess.DEVNULL,
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs))
+        return processes[-1]
+
+    def open_browser(url, *args, **kwargs):
+        marks["browser_open"] = time.time()
+        try:
+            with urllib.request.urlopen(url, timeout=RUN_TIMEOUT) as response:
+                response.read()
+            marks["page_load"] = time.time()
+        except OSError:
+            pass # e.g. the browser would have shown "connection refused"
+        raise BrowserOpened(url)
+
+    original_install = launcher.check_and_run_npm_install
+    original_launch = launcher.launch_in_new_terminal
+    launcher.check_and_run_npm_install = timed("install_check", original_install)
+    launcher.launch_in_new_terminal = timed("spawn", spawn_in_background)
+    original_open = webbrowser.open_new_tab
+    webbrowser.open_new_tab = open_browser
+
+    start = time.time()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            launcher.run_npm_dev_and_open_browser(work_dir, install=install)
+    except BrowserOpened:
+        pass
+    except SystemExit:
+        pass
+    finally:
+        webbrowser.open_new_tab = original_open
+        launcher.launch_in_new_terminal = original_launch
+        launcher.check_and_run_npm_install = original_install
+        for process in processes:
+            launcher.kill_process_tree(process) # Started in its own process group, like a headless dev server
+            process.wait()
+
+    try:
+        with open(events_path, "r", encoding="utf-8") as f:
+            for line in f:
+                event = json.loads(line)
+                marks.setdefault(event["event"], event["t"])
+    except OSError:
+        pass
+
+    result = {phase: (round((marks[phase] - start) * 1000, 2) if phase in marks else None) for phase in PHASES}
+    result["ok"] = "page_load" in marks
+    return result
+
+def run_benchmark(subcommand, scenario_names, runs):
+    """
+    Runs every scenario 'runs' times (after one warm-up run) and returns the JSON-ready results.
+    """
+    results = {
+        "meta": {
+            "subcommand": subcommand,
+            "runs": runs,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": {},
+    }
+    for name in scenario_names:
+        scenario = SCENARIOS[name]
+        work_dir = tempfile.mkdtemp(prefix="dev-starter-bench-")
+        cwd = os.getcwd()
+        try:
+            prepare_project(work_dir)
+            install = subcommand == "install-and-run"
+            run_once(work_dir, scenario, install) # Warm-up: file system caches, first imports
+            scenario_runs = []
+            for i in range(runs):
+                scenario_runs.append(run_once(work_dir, scenario, install))
+                run = scenario_runs[-1]
+                print(f"[{name}] run {i + 1}/{runs}: browser_open={run['browser_open']} ms, page_load={run['page_load']} ms", file=sys.stderr)
+        finally:
+            os.chdir(cwd) # The launcher changes into the project directory
+            shutil.rmtree(work_dir, ignore_errors=True)
+        ok_runs = [run for run in scenario_runs if run["ok"]]
+        results["scenarios"][name] = {
+            "config": scenario,
+            "failures": len(scenario_runs) - len(ok_runs),
+            "summary": summarize(ok_runs),
+            "runs": scenario_runs,
+        }
+    return results
+
+def compare_results(baseline, current):
+    """
+    Prints the p50/p95 change of every phase between two benchmark results.
+    """
+    print(f"\n{'scenario':<22}{'phase':<16}{'p50 base':>10}{'p50 now':>10}{'change':>9}{'p95 base':>10}{'p95 now':>10}{'change':>9}", file=sys.stderr)
+    for name, scenario in current["scenarios"].items():
+        base_summary = baseline.get("scenarios", {}).get(name, {}).get("summary", {})
+        for phase, stats in scenario["summary"].items():
+            base = base_summary.get(phase)
+            if not base:
+                continue
+            row = f"{name:<22}{phase:<16}"
+            for key in ("p50", "p95"):
+                change = (stats[key] - base[key]) / base[key] * 100 if base[key] else 0
+                row += f"{base[key]:>10.1f}{stats[key]:>10.1f}{change:>+8.0f}%"
+            print(row, file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dev-starter launch path against a stub dev server.")
+    parser.add_argument("-n", "--runs", type=int, default=10, help="measured runs per scenario (default: 10)")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="scenario to run (repeatable, default: all)")
+    parser.add_argument("--subcommand", choices=["run", "install-and-run"], default="install-and-run",
+                        help="dev-starter subcommand to benchmark (default: install-and-run)")
+    parser.add_argument("-o", "--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier JSON results to compare against")
+    # Stub server mode (used as the dev command during the benchmark)
+    parser.add_argument("--stub", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=5173, help=argparse.SUPPRESS)
+    parser.add_argument("--startup-delay", type=float, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--first-response-delay", type=float, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--late-bind", type=float, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stub:
+        return run_stub_server(args.port, args.startup_delay, args.first_response_delay, args.late_bind)
+
+    results = run_benchmark(args.subcommand, args.scenario or list(SCENARIOS), args.runs)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare_results(json.load(f), results)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""
+dev-starter: starts a project's npm dev server and opens it in the browser.
+"""
+
+__version__ = "1.0.0"
@@ -0,0 +1,11 @@
+import os
+import sys
+
+if not __package__:
+    # Run as 'python path/to/dev_starter' (the --tee wrapper does this): make the package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dev_starter.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
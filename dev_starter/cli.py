@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import sys
+
+from . import __version__
+
+# --- Command line ---
+# Only argument parsing and the config file live here, so that '--help', a typo
+# in a flag or a broken dev-starter.json are answered without importing the
+# launcher (subprocess, sockets, the browser module, ...). The launcher module
+# is imported once a subcommand actually runs.
+#
+#   dev-starter run                 # start the dev server and open the browser
+#   dev-starter install-and-run     # ... after installing dependencies if they changed
+#   dev-starter run --port 3000 --headless
+
+# Per-project settings file, read from the project directory
+CONFIG_FILE = "dev-starter.json"
+
+# Settings that can be given in the config file and on the command line:
+# (key in the config file, launcher setting it overrides, type, help text).
+# The command line flag is the key with dashes, e.g. "--retry-interval"; for
+# True/False settings there is also a "--no-..." flag.
+SETTINGS = [
+    ("port", "LOCALHOST_PORT", int, "port to poll while waiting for the dev server's URL banner"),
+    ("command", "DEV_COMMAND", str, "shell command that starts the dev server (default: '<package manager> run dev')"),
+    ("timeout", "SERVER_CHECK_TIMEOUT", float, "how long to wait for the server to become ready"),
+    ("retry_interval", "RETRY_INTERVAL", float, "longest wait between readiness checks"),
+    ("probe_initial_interval", "PROBE_INITIAL_INTERVAL", float, "first wait between readiness checks"),
+    ("probe_request_timeout", "PROBE_REQUEST_TIMEOUT", float, "timeout of a single readiness check"),
+    ("watch_output", "WATCH_DEV_SERVER_OUTPUT", bool, "open the browser as soon as the dev server prints its URL"),
+    ("banner_timeout", "BANNER_WAIT_TIMEOUT", float, "how long to wait for that URL (the port is polled meanwhile)"),
+    ("reuse", "REUSE_RUNNING_SERVER", bool, "re-use a dev server that is already running for the project"),
+    ("port_check", "CHECK_PORT_CONFLICTS", bool, "report which process holds the port if it is already taken"),
+    ("auto_port", "AUTO_PORT", bool, "if the port is taken, pass a free one to the dev script ('--port N')"),
+    ("workspaces", "LAUNCH_WORKSPACES", bool, "launch every workspace app with a 'dev' script (monorepos)"),
+    ("headless", "HEADLESS", bool, "run the dev server in this terminal instead of a new window"),
+    ("headless_fallback", "HEADLESS_FALLBACK", bool, "run headless when no terminal window can be opened"),
+    ("watch_deps", "WATCH_DEPENDENCIES", bool, "reinstall and restart the dev server when package.json or the lockfile changes (runs headless)"),
+    ("prewarm", "PREWARM_MODULES", bool, "request the app's modules before opening the browser, so the first load is fast"),
+    ("prewarm_workers", "PREWARM_WORKERS", int, "how many modules to request at a time when pre-warming"),
+    ("prewarm_timeout", "PREWARM_TIMEOUT", float, "longest time to spend pre-warming"),
+    ("prewarm_max_modules", "PREWARM_MAX_MODULES", int, "most modules to request when pre-warming"),
+    ("restart_max_delay", "RESTART_MAX_DELAY", float, "headless: longest wait before restarting a crashed server"),
+    ("install_log_tail_lines", "INSTALL_LOG_TAIL_LINES", int, "install output lines repeated if the install fails"),
+    ("closing_pause", "CLOSING_PAUSE", float, "how long to keep the output on screen before exiting"),
+    ("trace", "TRACE_LOG", str, "write a JSONL timing log of the launch phases to this file"),
+    ("trace_chrome", "TRACE_CHROME", str, "write a Chrome trace of the launch phases to this file"),
+]
+
+class ConfigError(Exception):
+    """
+    Raised for a config file that can't be used; the message says why.
+    """
+
+def convert_setting(key, value_type, value):
+    """
+    Checks a value from the config file against the setting's type.
+    Returns the value (an int is accepted for float settings).
+    """
+    if value is None and value_type is str:
+        return None # e.g. "command": null for the default command
+    if value_type is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, value_type) or (value_type is int and isinstance(value, bool)):
+        raise ConfigError(f"'{key}' must be {value_type.__name__}, not {json.dumps(value)}")
+    return value
+
+def load_config(project_dir):
+    """
+    Reads CONFIG_FILE from project_dir. Returns a dictionary {launcher setting: value},
+    empty if there is no config file. Raises ConfigError if it is invalid.
+    """
+    path = os.path.join(project_dir, CONFIG_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Could not read {path}: {e}")
+    if not isinstance(config, dict):
+        raise ConfigError(f"{path} must contain a JSON object")
+
+    settings = {key: (name, value_type) for key, name, value_type, _ in SETTINGS}
+    overrides = {}
+    for key, value in config.items():
+        if key not in settings:
+            raise ConfigError(f"Unknown setting '{key}' in {path} (known: {', '.join(sorted(settings))})")
+        name, value_type = settings[key]
+        try:
+            overrides[name] = convert_setting(key, value_type, value)
+        except ConfigError as e:
+            raise ConfigError(f"{path}: {e}")
+    return overrides
+
+def build_parser():
+    """
+    Returns the argument parser for the 'dev-starter' command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="dev-starter",
+        description="Start a project's npm dev server and open it in the browser.",
+        epilog=f"Settings can also be stored in {CONFIG_FILE} in the project directory; flags override them.",
+    )
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+
+    # Options shared by all subcommands, so they can follow the subcommand
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-C", "--project-dir", default=os.getcwd(), help="project directory (default: the current directory)")
+    # Also after the subcommand, for run.py / run2.py, which put it before the user's arguments
+    common.add_argument("--version", action="version", version=f"dev-starter {__version__}")
+    settings = common.add_argument_group("settings", f"Override the defaults and {CONFIG_FILE}. "
+                                                      "On/off settings can be turned off with --no-..., e.g. --no-reuse.")
+    for key, _, value_type, help_text in SETTINGS:
+        flag = "--" + key.replace("_", "-")
+        if value_type is bool:
+            settings.add_argument(flag, dest=key, action="store_const", const=True, default=None, help=help_text)
+            settings.add_argument("--no-" + flag[2:], dest=key, action="store_const", const=False, help=argparse.SUPPRESS)
+        else:
+            metavar = {int: "N", float: "SECONDS"}.get(value_type, key.upper())
+            settings.add_argument(flag, dest=key, type=value_type, metavar=metavar, help=help_text)
+
+    subcommands = parser.add_subparsers(dest="subcommand", metavar="COMMAND")
+    subcommands.required = True
+    subcommands.add_parser("run", parents=[common], help="start the dev server and open the browser",
+                           description="Start the dev server (or re-use a running one) and open the browser.")
+    subcommands.add_parser("install-and-run", parents=[common], help="install dependencies if they changed, then run",
+                           description="Install the project's dependencies if they changed since the last install, "
+                                       "then start the dev server and open the browser.")
+    return parser
+
+def main(argv=None):
+    """
+    Entry point of the 'dev-starter' command. Returns the exit code.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    # The new terminal runs "dev-starter --tee <log> <command>" or, for an argument
+    # list, "dev-starter --tee <log> -- <program> <args...>" (see launcher.build_dev_server_command)
+    if len(argv) > 2 and argv[0] == "--tee":
+        from . import launcher
+        command = argv[3:] if argv[2] == "--" and len(argv) > 3 else " ".join(argv[2:])
+        return launcher.tee_dev_server_output(argv[1], command)
+
+    args = build_parser().parse_args(argv)
+    project_dir = os.path.abspath(args.project_dir)
+    try:
+        overrides = load_config(project_dir)
+    except ConfigError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    # Environment variables beat the config file for tracing, flags beat both
+    for variable, name in (("DEV_STARTER_TRACE", "TRACE_LOG"), ("DEV_STARTER_TRACE_CHROME", "TRACE_CHROME")):
+        if os.environ.get(variable):
+            overrides[name] = os.environ[variable]
+    for key, name, _, _ in SETTINGS:
+        if getattr(args, key) is not None:
+            overrides[name] = getattr(args, key)
+
+    from . import launcher
+    for name, value in overrides.items():
+        setattr(launcher, name, value)
+    if launcher.TRACE_LOG or launcher.TRACE_CHROME:
+        launcher.enable_tracing(launcher.TRACE_LOG, launcher.TRACE_CHROME)
+    launcher.run_npm_dev_and_open_browser(project_dir, install=args.subcommand == "install-and-run")
+    return 0
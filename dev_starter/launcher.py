@@ -0,0 +1,2921 @@
+import atexit
+import binascii
+import collections
+import contextlib
+import errno
+import json
+import os
+import re
+import select
+import selectors
+import shlex
+import shutil
+import signal
+import subprocess
+import platform
+import socket
+import struct
+import sys
+import threading
+import time
+import urllib.parse
+
+# --- Configuration ---
+# Defaults for every setting. A project can override them in dev-starter.json
+# or with command line flags (see SETTINGS in cli.py).
+LOCALHOST_PORT = 5173 # Set as default to http://localhost:5173/
+
+# Command that starts the dev server. None means "<package manager> run dev",
+# e.g. "npm run dev" or "pnpm run dev" depending on your lockfile.
+DEV_COMMAND = None
+
+# How long to wait for the server to become ready before giving up (in seconds)
+SERVER_CHECK_TIMEOUT = 60
+
+# Readiness checks start PROBE_INITIAL_INTERVAL seconds apart and back off
+# exponentially up to RETRY_INTERVAL seconds, so a server that comes up
+# quickly is noticed within a few milliseconds
+RETRY_INTERVAL = 1
+PROBE_INITIAL_INTERVAL = 0.05
+
+# How long a single connection attempt / HTTP request may take (in seconds)
+PROBE_REQUEST_TIMEOUT = 5
+
+# Watch the dev server's output and open the browser as soon as it prints its
+# "Local: http://..." banner, using the URL/port from that line. Set to False to
+# always poll LOCALHOST_PORT instead.
+WATCH_DEV_SERVER_OUTPUT = True
+
+# How long to wait for a recognisable banner (in seconds). LOCALHOST_PORT is
+# polled meanwhile, so a server whose banner isn't recognised is found anyway.
+BANNER_WAIT_TIMEOUT = 20
+
+# If a dev server started by dev-starter for this project is still running and
+# answering, just open the browser again instead of starting a second one
+REUSE_RUNNING_SERVER = True
+
+# Monorepos: launch every workspace package (npm/yarn "workspaces" or
+# pnpm-workspace.yaml) that has a "dev" script, each in its own terminal, and
+# open each app as soon as it is ready.
+LAUNCH_WORKSPACES = False
+
+# How many of the last 'npm install' output lines to repeat if the install fails
+INSTALL_LOG_TAIL_LINES = 50
+
+# Name of the file (stored inside node_modules) that remembers what the last
+# successful 'npm install' was run against. Delete it to force a reinstall.
+FINGERPRINT_FILE = ".dev-starter-fingerprint.json"
+
+# Run the dev server inside this terminal instead of opening a new terminal
+# window: its output is shown here, it is restarted if it crashes and Ctrl-C
+# stops it. With HEADLESS_FALLBACK this
+# happens automatically when no terminal window can be opened (e.g. over SSH).
+HEADLESS = False
+HEADLESS_FALLBACK = True
+
+# Headless mode: how many recent output lines to keep in memory, and how large
+# the dev server log file may grow before it is rotated (in bytes)
+HEADLESS_LOG_LINES = 1000
+HEADLESS_LOG_MAX_BYTES = 5 * 1024 * 1024
+HEADLESS_CRASH_CONTEXT = 20 # Lines repeated after a crash when several apps share the output
+
+# Headless mode: a crashed dev server is restarted after RESTART_INITIAL_DELAY
+# seconds, doubling up to RESTART_MAX_DELAY while it keeps crashing; the delay
+# resets once it stayed up for RESTART_STABLE_AFTER seconds. On Ctrl-C it gets
+# STOP_TIMEOUT seconds to shut down before it is killed.
+RESTART_INITIAL_DELAY = 0.5
+RESTART_MAX_DELAY = 30
+RESTART_STABLE_AFTER = 30
+STOP_TIMEOUT = 5
+
+# Headless mode: watch package.json and the lockfile while the dev server runs,
+# and when they change (e.g. after 'git pull' or switching branches) install
+# what is needed and restart the dev server. Changes are collected until none
+# arrived for WATCH_DEBOUNCE seconds. Without inotify (Linux), the files are
+# checked every WATCH_POLL_INTERVAL seconds. Turning this on implies HEADLESS.
+WATCH_DEPENDENCIES = False
+WATCH_DEBOUNCE = 1.0
+WATCH_POLL_INTERVAL = 2.0
+
+# Record how long each launch phase and readiness probe takes. Set TRACE_LOG to
+# a file path for a JSONL event log and/or TRACE_CHROME for a Chrome trace file
+# (open it in chrome://tracing or https://ui.perfetto.dev); a summary table is
+# printed at exit. The DEV_STARTER_TRACE / DEV_STARTER_TRACE_CHROME environment
+# variables do the same without touching the configuration.
+TRACE_LOG = None
+TRACE_CHROME = None
+
+# Before launching, check whether LOCALHOST_PORT is already taken and by which
+# process. With AUTO_PORT a free port is picked instead and passed to the dev
+# script as '--port <n>' (and in the PORT environment variable).
+CHECK_PORT_CONFLICTS = True
+AUTO_PORT = False
+
+# Ports to look for the dev server on (all at once) when it prints no banner,
+# e.g. because it moved away from a taken LOCALHOST_PORT on its own
+DEV_PORTS = [5173, 5174, 5175, 5176, 5177, 5178, 5179, 5180, 3000, 4200, 8080]
+
+# Before opening the browser, request the entry page and every module it imports
+# (PREWARM_WORKERS at a time, for at most PREWARM_TIMEOUT seconds and
+# PREWARM_MAX_MODULES modules), so dev servers that compile modules on first
+# request (like Vite) have them ready when the browser asks
+PREWARM_MODULES = False
+PREWARM_WORKERS = 8
+PREWARM_TIMEOUT = 10
+PREWARM_MAX_MODULES = 1000
+
+# How long to keep the launcher's output on screen before it exits, for when it
+# was started by double-clicking (in seconds). 0 exits right away.
+CLOSING_PAUSE = 5
+
+# ---------------------
+
+# --- Timing instrumentation ---
+# Named spans around each launch phase and each readiness probe attempt. Off by
+# default; when off, trace_span() hands back a no-op context manager around a
+# fresh dictionary, so an instrumented block costs a single function call.
+
+trace_events = None # List of finished spans while tracing is enabled
+trace_lock = threading.Lock()
+trace_log_file = None
+trace_origin = 0.0
+
+def enable_tracing(jsonl_path=None, chrome_path=None):
+    """
+    Starts recording spans. Each finished span is appended to jsonl_path (one
+    JSON object per line) as it happens; chrome_path receives a Chrome
+    trace_event file at exit. A summary table is printed at exit either way.
+    """
+    global trace_events, trace_log_file, trace_origin
+    trace_events = []
+    trace_origin = time.perf_counter()
+    if jsonl_path:
+        trace_log_file = open(jsonl_path, "w", encoding="utf-8")
+    atexit.register(finish_tracing, chrome_path)
+
+@contextlib.contextmanager
+def record_trace_span(name, args):
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield args
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        end = time.perf_counter()
+        event = {
+            "name": name,
+            "start_ms": round((start - trace_origin) * 1000, 3),
+            "duration_ms": round((end - start) * 1000, 3),
+            "thread": threading.current_thread().name,
+            "tid": threading.get_ident(),
+            "status": status,
+            "args": args,
+        }
+        with trace_lock:
+            trace_events.append(event)
+            if trace_log_file is not None:
+                trace_log_file.write(json.dumps(event, default=str) + "\n")
+                trace_log_file.flush()
+
+def trace_span(name, **args):
+    """
+    Returns a context manager that records how long its block takes under 'name'.
+    It yields the span's argument dictionary, so results can be attached:
+        with trace_span("probe", attempt=1) as span:
+            span["result"] = "refused"
+    """
+    if trace_events is None:
+        return contextlib.nullcontext({}) # A dictionary per span, so nothing written into it is shared
+    return record_trace_span(name, args)
+
+def write_chrome_trace(path):
+    """
+    Writes the recorded spans as a Chrome trace_event file (chrome://tracing, Perfetto).
+    """
+    pid = os.getpid()
+    thread_ids = {}
+    events = []
+    for event in trace_events:
+        if event["tid"] not in thread_ids:
+            thread_ids[event["tid"]] = len(thread_ids) + 1
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_ids[event["tid"]],
+                           "args": {"name": event["thread"]}})
+        events.append({
+            "name": event["name"],
+            "cat": "dev-starter",
+            "ph": "X",
+            "ts": round(event["start_ms"] * 1000),
+            "dur": round(event["duration_ms"] * 1000),
+            "pid": pid,
+            "tid": thread_ids[event["tid"]],
+            "args": dict(event["args"], status=event["status"]),
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+def print_trace_summary():
+    """
+    Prints count, total, mean and max duration per span name, in order of first appearance.
+    """
+    totals = {}
+    for event in trace_events:
+        entry = totals.setdefault(event["name"], {"count": 0, "total": 0.0, "max": 0.0})
+        entry["count"] += 1
+        entry["total"] += event["duration_ms"]
+        entry["max"] = max(entry["max"], event["duration_ms"])
+
+    print("\n--- Launch timing (ms) ---")
+    print(f"{'phase':<24}{'count':>6}{'total':>11}{'mean':>11}{'max':>11}")
+    for name, entry in totals.items():
+        print(f"{name:<24}{entry['count']:>6}{entry['total']:>11.1f}{entry['total'] / entry['count']:>11.1f}{entry['max']:>11.1f}")
+    print("--------------------------")
+
+def finish_tracing(chrome_path=None):
+    """
+    Prints the summary table and writes/closes the trace files (registered with atexit).
+    """
+    global trace_log_file
+    if trace_events is None:
+        return
+    if trace_events:
+        print_trace_summary()
+    if chrome_path:
+        try:
+            write_chrome_trace(chrome_path)
+            print(f"Chrome trace written to {chrome_path} (open it in chrome://tracing or https://ui.perfetto.dev)")
+        except OSError as e:
+            print(f"Warning: could not write Chrome trace ({e}).")
+    # Daemon threads (the banner poll, the browser opener) may still be recording spans
+    with trace_lock:
+        if trace_log_file is not None:
+            trace_log_file.close()
+            trace_log_file = None
+
+# --- Server readiness probe ---
+# Uses plain sockets instead of an HTTP library: a non-blocking TCP connect to
+# every address the host resolves to (IPv4 and IPv6), then a minimal HTTP HEAD.
+# Any HTTP status line counts as "ready", just like any response did before.
+
+def resolve_probe_addresses(host, port):
+    """
+    Returns a list of (family, sockaddr) tuples to probe for host:port.
+    'localhost' always includes both ::1 and 127.0.0.1, because dev servers on
+    newer Node versions often listen on only one of them.
+    """
+    addresses = []
+    try:
+        for family, _, _, _, sockaddr in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM):
+            if (family, sockaddr) not in addresses:
+                addresses.append((family, sockaddr))
+    except socket.gaierror as e:
+        print(f"Could not resolve '{host}': {e}")
+
+    if host == "localhost":
+        for family, sockaddr in ((socket.AF_INET6, ("::1", port, 0, 0)), (socket.AF_INET, ("127.0.0.1", port))):
+            if not any(a[0] == family for a in addresses):
+                addresses.append((family, sockaddr))
+    return addresses
+
+def connect_many(addresses, timeout, first_only=False):
+    """
+    Starts a non-blocking TCP connect to every (family, sockaddr) address at
+    once and waits up to timeout seconds for them. With first_only it stops at
+    the first connection. Returns a list of (sockaddr, socket) pairs for the
+    connections that succeeded, in non-blocking mode; the caller closes them.
+    """
+    in_progress = {0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN, getattr(errno, "WSAEWOULDBLOCK", 0)}
+    selector = selectors.DefaultSelector()
+    pending = {}
+    connected = []
+    try:
+        for family, sockaddr in addresses:
+            try:
+                sock = socket.socket(family, socket.SOCK_STREAM)
+            except OSError:
+                continue # e.g. IPv6 disabled on this machine
+            sock.setblocking(False)
+            if sock.connect_ex(sockaddr) not in in_progress:
+                sock.close()
+                continue
+            selector.register(sock, selectors.EVENT_WRITE)
+            pending[sock] = sockaddr
+
+        deadline = time.monotonic() + timeout
+        while pending and not (first_only and connected):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(remaining):
+                sock = key.fileobj
+                selector.unregister(sock)
+                sockaddr = pending.pop(sock)
+                if not (first_only and connected) and sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    connected.append((sockaddr, sock))
+                else:
+                    sock.close()
+    finally:
+        for sock in pending:
+            sock.close()
+        selector.close()
+    return connected
+
+def open_probe_connection(addresses, timeout):
+    """
+    Connects to every address at once and returns the first socket that
+    connects (in blocking mode), or None.
+    """
+    connected = connect_many(addresses, timeout, first_only=True)
+    if not connected:
+        return None
+    sock = connected[0][1]
+    sock.setblocking(True)
+    return sock
+
+dev_ssl_context = None # Built on first use by get_dev_ssl_context
+
+def get_dev_ssl_context():
+    """
+    Returns the SSL context for talking to local https dev servers, which
+    accepts any certificate (dev certificates are usually self-signed). It is
+    built once, on first use, and shared by every probe and pre-warm
+    connection; as nothing is verified, no CA certificates are loaded.
+    """
+    global dev_ssl_context
+    if dev_ssl_context is None:
+        import ssl # Only needed for https dev servers
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        dev_ssl_context = context
+    return dev_ssl_context
+
+def send_probe_request(sock, host_header, path, timeout, use_tls=False):
+    """
+    Sends a minimal HTTP HEAD request over sock and returns the response's
+    status code. Raises OSError (including socket.timeout) if no valid status
+    line arrives.
+    """
+    sock.settimeout(timeout)
+    if use_tls:
+        sock = get_dev_ssl_context().wrap_socket(sock, server_hostname=host_header.split(":")[0].strip("[]"))
+
+    request = f"HEAD {path} HTTP/1.1\r\nHost: {host_header}\r\nConnection: close\r\n\r\n"
+    sock.sendall(request.encode("ascii"))
+    data = b""
+    while b"\r\n" not in data and len(data) < 4096:
+        chunk = sock.recv(1024)
+        if not chunk:
+            break
+        data += chunk
+
+    status_line = data.split(b"\r\n", 1)[0].decode("latin-1")
+    parts = status_line.split()
+    if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+        raise OSError(f"unexpected response {status_line!r}")
+    return int(parts[1])
+
+def parse_probe_url(url):
+    """
+    Splits a URL into what the probe needs.
+    Returns a tuple (addresses, host_header, path, use_tls).
+    """
+    parsed = urllib.parse.urlsplit(url)
+    use_tls = parsed.scheme == "https"
+    port = parsed.port or (443 if use_tls else 80)
+    addresses = resolve_probe_addresses(parsed.hostname or "localhost", port)
+    return addresses, parsed.netloc, parsed.path or "/", use_tls
+
+def probe_url(url, timeout=None):
+    """
+    Makes a single, quiet readiness probe (timeout defaults to
+    PROBE_REQUEST_TIMEOUT). Returns the HTTP status code, or None if nothing answered.
+    """
+    timeout = PROBE_REQUEST_TIMEOUT if timeout is None else timeout
+    addresses, host_header, path, use_tls = parse_probe_url(url)
+    sock = open_probe_connection(addresses, timeout)
+    if sock is None:
+        return None
+    try:
+        return send_probe_request(sock, host_header, path, timeout, use_tls)
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+def backoff_attempts(timeout, interval=None, stop=None):
+    """
+    Paces the attempts of a readiness check over timeout seconds: yields a
+    tuple (attempt number, seconds left, delay before the next attempt) per
+    attempt and sleeps for that delay in between, starting at
+    PROBE_INITIAL_INTERVAL and doubling up to interval (RETRY_INTERVAL by default).
+    Ends early once the threading.Event 'stop' is set.
+    """
+    interval = RETRY_INTERVAL if interval is None else interval
+    stop = stop or threading.Event()
+    start_time = time.monotonic()
+    delay = PROBE_INITIAL_INTERVAL
+    attempt = 0
+    while not stop.is_set():
+        remaining = timeout - (time.monotonic() - start_time)
+        if remaining <= 0:
+            return
+        attempt += 1
+        yield attempt, remaining, delay
+        if stop.wait(max(0, min(delay, timeout - (time.monotonic() - start_time)))):
+            return
+        delay = min(delay * 2, interval)
+
+def check_server_ready(url, timeout=None, interval=None, stop=None):
+    """
+    Checks if the server at the given URL is ready with a TCP connect followed by
+    an HTTP HEAD request. Retries start after PROBE_INITIAL_INTERVAL and back off
+    exponentially up to 'interval' seconds. timeout and interval default to
+    SERVER_CHECK_TIMEOUT and RETRY_INTERVAL, read at call time so configuration
+    changes apply. Gives up quietly once the threading.Event 'stop' is set.
+    Returns True if ready, False otherwise.
+    """
+    timeout = SERVER_CHECK_TIMEOUT if timeout is None else timeout
+    addresses, host_header, path, use_tls = parse_probe_url(url)
+
+    print(f"\nAttempting to connect to {url}...")
+    for attempt, remaining, delay in backoff_attempts(timeout, interval, stop):
+        with trace_span("probe", url=url, attempt=attempt) as span:
+            sock = open_probe_connection(addresses, min(remaining, PROBE_REQUEST_TIMEOUT))
+            if sock is None:
+                span["result"] = "refused"
+                print(f"Connection refused to {url}. Server not yet ready. Retrying in {delay:.2f}s...")
+            else:
+                try:
+                    status = send_probe_request(sock, host_header, path, PROBE_REQUEST_TIMEOUT, use_tls)
+                    span["result"] = status
+                    print(f"Server responded (status: {status}). Server is ready!")
+                    return True
+                except socket.timeout:
+                    span["result"] = "timeout"
+                    print(f"Request timed out for {url}. Server not yet ready. Retrying in {delay:.2f}s...")
+                except OSError as e:
+                    span["result"] = "no response"
+                    print(f"Server at {url} is listening but not answering yet ({e}). Retrying in {delay:.2f}s...")
+                finally:
+                    sock.close()
+
+    if not (stop and stop.is_set()):
+        print(f"Server at {url} did not become ready within {timeout} seconds.")
+    return False
+
+# --- Port conflicts ---
+# Before a launch, the configured port and the usual dev server ports are
+# checked all at once. A taken LOCALHOST_PORT is reported together with the
+# process holding it (or replaced by a free port with AUTO_PORT), and ports that
+# were taken before the launch are never mistaken for the new dev server.
+
+def scan_ports(ports, host="localhost", timeout=0.25):
+    """
+    Connects to every port at once (on every address of host, so both ::1 and
+    127.0.0.1 for localhost). Returns the set of ports that accepted a
+    connection within timeout.
+    """
+    host_addresses = resolve_probe_addresses(host, 0)
+    addresses = [(family, sockaddr[:1] + (port,) + sockaddr[2:]) for port in ports for family, sockaddr in host_addresses]
+    listening = set()
+    for sockaddr, sock in connect_many(addresses, timeout):
+        listening.add(sockaddr[1])
+        sock.close()
+    return listening
+
+def find_port_owner(port):
+    """
+    Looks up the process listening on a local TCP port.
+    Returns a tuple (pid, command line), or (None, None) if it can't be found
+    (e.g. it belongs to another user, or the lookup tool is missing).
+    """
+    system = platform.system()
+    if system == "Linux":
+        # /proc/net/tcp lists listening sockets (state 0A) with their inode; /proc/<pid>/fd links to them
+        sockets = set()
+        for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+            try:
+                with open(table, "r") as f:
+                    next(f, None)
+                    for line in f:
+                        fields = line.split()
+                        if len(fields) > 9 and fields[3] == "0A" and int(fields[1].rsplit(":", 1)[1], 16) == port:
+                            sockets.add(f"socket:[{fields[9]}]")
+            except OSError:
+                pass
+        for pid in filter(str.isdigit, os.listdir("/proc") if sockets else []):
+            fd_dir = os.path.join("/proc", pid, "fd")
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue # Gone, or not ours to look at
+            for fd in fds:
+                try:
+                    if os.readlink(os.path.join(fd_dir, fd)) not in sockets:
+                        continue
+                except OSError:
+                    continue # Closed since the listing; the process's other descriptors still count
+                try:
+                    with open(os.path.join("/proc", pid, "cmdline"), "rb") as f:
+                        return int(pid), f.read().replace(b"\0", b" ").decode("utf-8", "replace").strip()
+                except OSError:
+                    return int(pid), None # Exited just now
+        return None, None
+
+    try:
+        if system == "Windows":
+            output = subprocess.run(["netstat", "-ano", "-p", "TCP"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                    universal_newlines=True, timeout=5).stdout
+            for line in output.splitlines():
+                fields = line.split()
+                if len(fields) == 5 and fields[3] == "LISTENING" and fields[1].rsplit(":", 1)[-1] == str(port):
+                    pid = int(fields[4])
+                    task = subprocess.run(["tasklist", "/FI", f"PID eq {pid}", "/FO", "CSV", "/NH"], stdout=subprocess.PIPE,
+                                          stderr=subprocess.DEVNULL, universal_newlines=True, timeout=5).stdout
+                    return pid, task.split(",")[0].strip('"\n') or None
+        else: # macOS and other Unix systems
+            output = subprocess.run(["lsof", "-nP", f"-iTCP:{port}", "-sTCP:LISTEN", "-Fpc"], stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, universal_newlines=True, timeout=5).stdout
+            fields = {line[:1]: line[1:] for line in output.splitlines() if line}
+            if fields.get("p", "").isdigit():
+                return int(fields["p"]), fields.get("c")
+    except (OSError, subprocess.SubprocessError, ValueError):
+        pass
+    return None, None
+
+def describe_port_owner(port):
+    """
+    Returns a description of the process holding a taken port, e.g. "PID 4242 (node vite)".
+    """
+    pid, command = find_port_owner(port)
+    return f"PID {pid}" + (f" ({command})" if command else "") if pid else "another process"
+
+def report_port_owner(port, label=""):
+    """
+    Prints which process is holding a taken port.
+    """
+    print(f"{label}Port {port} is already in use by {describe_port_owner(port)}.")
+
+def scan_dev_ports(port):
+    """
+    Scans port and DEV_PORTS all at once. Returns the set of taken ones.
+    """
+    with trace_span("port_check", port=port) as span:
+        busy = scan_ports(sorted(set([port] + DEV_PORTS)))
+        span["busy"] = sorted(busy)
+    return busy
+
+def check_port_conflicts(port, label="", busy=None):
+    """
+    Scans port and DEV_PORTS before a launch and reports which process holds
+    port if it is taken; pass busy to re-use a scan whose result was already
+    reported (see check_port). Returns a tuple (busy ports, free port): free
+    port is the first free port above 'port' if it is taken and AUTO_PORT is
+    on, else None.
+    """
+    if busy is None:
+        busy = scan_dev_ports(port)
+        if port in busy:
+            report_port_owner(port, label)
+    if port not in busy:
+        return busy, None
+
+    if not AUTO_PORT:
+        print(f"{label}The dev server will probably pick another port; dev-starter follows its URL banner "
+              f"(or looks for it on the usual ports). Use --auto-port to pick a free port up front.")
+        return busy, None
+
+    candidates = range(port + 1, port + 51)
+    taken = busy | scan_ports(candidates)
+    free = next((candidate for candidate in candidates if candidate not in taken), None)
+    if free is None:
+        print(f"{label}No free port found between {port + 1} and {port + 50}.")
+    return busy, free
+
+# Splits a shell command line into its commands: "cd web && npm run dev"
+# The '&' of a redirection ('2>&1', '>&2', '&> log') doesn't separate commands
+SHELL_OPERATOR = re.compile(r"(\s*(?:&&|\|\||\|&?|;|(?<![<>&])&(?![>&]))\s*)")
+
+# The first redirection of a command ('> log', '2>&1', '&> log', '< input')
+SHELL_REDIRECTION = re.compile(r"\s(?:\d*[<>]|&>)")
+
+# Variable assignments before the program: "PORT=3001 npm run dev"
+SHELL_ASSIGNMENT = re.compile(r"[A-Za-z_][A-Za-z0-9_]*=")
+
+def get_program_words(command):
+    """
+    Returns the words of one simple shell command up to its first
+    redirection, without leading NAME=value assignments (so the first word is
+    the program). Empty if there is no program.
+    """
+    redirection = SHELL_REDIRECTION.search(f" {command}")
+    words = (command[:redirection.start()] if redirection else command).split()
+    while words and SHELL_ASSIGNMENT.match(words[0]):
+        words.pop(0)
+    return words
+
+def add_port_argument(npm_command, port):
+    """
+    Returns npm_command with '--port <port>' passed on to the dev script
+    (after '--' for npm, which would otherwise take the option itself). An
+    argument list gets it at the end; in a shell command line (DEV_COMMAND) it
+    goes ahead of any redirections, and in a compound command like
+    "cd web && npm run dev" to the last package manager call. Returns None if
+    it can't tell where the option belongs (subshells, quotes around shell
+    operators, or several commands none of which is a package manager call).
+    """
+    if not isinstance(npm_command, str):
+        separator = ["--"] if npm_command[0] == "npm" and "--" not in npm_command else []
+        return list(npm_command) + separator + ["--port", str(port)]
+    if re.search(r"[()`]", npm_command) or (re.search(r"[\"']", npm_command) and re.search(r"[&|;<>]", npm_command)):
+        return None
+    parts = SHELL_OPERATOR.split(npm_command.strip()) # Commands at even indexes, operators in between
+    commands = parts[::2]
+    if len(commands) == 1:
+        index = 0
+    else:
+        index = next((i for i in reversed(range(len(commands))) if get_program_words(commands[i])[:1] in ([pm] for pm in PACKAGE_MANAGERS)), None)
+        if index is None:
+            return None
+    command = commands[index].rstrip()
+    words = get_program_words(command)
+    if not words:
+        return None
+    option = f"-- --port {port}" if words[0] == "npm" and "--" not in words else f"--port {port}"
+    redirection = SHELL_REDIRECTION.search(command)
+    if redirection:
+        parts[index * 2] = f"{command[:redirection.start()]} {option}{command[redirection.start():]}"
+    else:
+        parts[index * 2] = f"{command} {option}"
+    return "".join(parts)
+
+def wait_for_dev_port(fallback_url, busy_ports=(), timeout=None, label="", stop=None):
+    """
+    Looks for a dev server that printed no banner: polls the port of
+    fallback_url and every port in DEV_PORTS at once, backing off like
+    check_server_ready, and skips busy_ports (taken before the launch, so
+    whatever answers there isn't the new server). Gives up quietly once the
+    threading.Event 'stop' is set.
+    Returns the URL of the first of these ports that answers HTTP, or None.
+    """
+    timeout = SERVER_CHECK_TIMEOUT if timeout is None else timeout
+    parsed = urllib.parse.urlsplit(fallback_url)
+    host = parsed.hostname or "localhost"
+    default_port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    ports = [port for port in dict.fromkeys([default_port] + DEV_PORTS) if port not in busy_ports]
+    if not ports:
+        print(f"{label}Every port the dev server could be on was already taken before it started.")
+        return None
+
+    print(f"\n{label}Looking for the dev server on port{'s' if len(ports) > 1 else ''} {', '.join(map(str, ports))}...")
+    for attempt, remaining, _ in backoff_attempts(timeout, stop=stop):
+        with trace_span("port_scan", attempt=attempt) as span:
+            listening = scan_ports(ports, host, timeout=min(0.25, remaining))
+            span["listening"] = sorted(listening)
+            for port in (port for port in ports if port in listening): # In order of preference
+                netloc = f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+                url = urllib.parse.urlunsplit((parsed.scheme, netloc, parsed.path or "/", "", ""))
+                if probe_url(url, timeout=min(PROBE_REQUEST_TIMEOUT, remaining)) is not None:
+                    if port != default_port:
+                        print(f"{label}Found the dev server on port {port} instead of {default_port}.")
+                    return url
+
+    if not (stop and stop.is_set()):
+        print(f"{label}No dev server answered on those ports within {timeout} seconds.")
+    return None
+
+def confirm_server_listening(url, timeout=None):
+    """
+    Makes sure a server that announced url in its banner also answers there
+    (some print the banner just before binding the port), so the browser
+    doesn't open on "connection refused". Returns True if it answers within timeout.
+    """
+    if probe_url(url, timeout=1) is not None:
+        return True
+    print(f"{url} was announced but isn't answering yet. Waiting for it...")
+    return check_server_ready(url, timeout=timeout)
+
+# --- Module pre-warming ---
+# Vite (and similar dev servers) transform each module on its first request, so
+# a server that answers the readiness probe can still keep the browser waiting
+# for the first compile. Pre-warming requests the entry page and every module it
+# imports, a few at a time, before the browser is opened, so those requests are
+# answered from the server's transform cache.
+
+# Module URLs referenced by the entry HTML
+SCRIPT_SRC_PATTERN = re.compile(r"""<script\b[^>]*?\bsrc\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+LINK_TAG_PATTERN = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+LINK_HREF_PATTERN = re.compile(r"""\bhref\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+LINK_REL_PATTERN = re.compile(r"""\brel\s*=\s*["']?(?:modulepreload|stylesheet|preload)\b""", re.IGNORECASE)
+INLINE_SCRIPT_PATTERN = re.compile(r"<script\b[^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL)
+
+# Static imports in (transformed) JavaScript: import x from "...", import "...", export ... from "..."
+IMPORT_PATTERN = re.compile(r"""(?:\bimport\s*(?:[\w$*{}\s,]+?\s*from\s*)?|\bexport\s*[\w$*{}\s,]+?\s*from\s*)["']([^"'\n]+)["']""")
+
+def find_entry_references(html):
+    """
+    Returns the script, stylesheet and preload URLs an HTML page references,
+    including modules imported by its inline scripts.
+    """
+    references = SCRIPT_SRC_PATTERN.findall(html)
+    for tag in LINK_TAG_PATTERN.findall(html):
+        href = LINK_HREF_PATTERN.search(tag)
+        if href and LINK_REL_PATTERN.search(tag):
+            references.append(href.group(1))
+    for script in INLINE_SCRIPT_PATTERN.findall(html):
+        references.extend(IMPORT_PATTERN.findall(script))
+    return references
+
+def find_module_imports(source):
+    """
+    Returns the relative and absolute-path specifiers a JavaScript module
+    imports statically (bare specifiers are skipped; the dev server has
+    rewritten the ones it serves).
+    """
+    return [spec for spec in IMPORT_PATTERN.findall(source) if spec.startswith(("/", "./", "../"))]
+
+def prewarm_dev_server(url, workers=None, timeout=None, max_modules=None):
+    """
+    Fetches the entry page at url, then every script, stylesheet and module it
+    references, following static imports, with up to 'workers' requests at a
+    time (defaults: PREWARM_WORKERS, PREWARM_TIMEOUT, PREWARM_MAX_MODULES).
+    Returns a tuple (modules warmed, failed requests, seconds taken).
+    """
+    import concurrent.futures # Only needed for pre-warming
+    import http.client
+    workers = PREWARM_WORKERS if workers is None else workers
+    timeout = PREWARM_TIMEOUT if timeout is None else timeout
+    max_modules = PREWARM_MAX_MODULES if max_modules is None else max_modules
+
+    origin = urllib.parse.urlsplit(url)
+    start = time.monotonic()
+    deadline = start + timeout
+    local = threading.local() # One keep-alive connection per worker thread
+    connections = []
+    connections_lock = threading.Lock()
+
+    def fetch(path, accept):
+        connection = getattr(local, "connection", None)
+        if connection is None:
+            if origin.scheme == "https":
+                connection = http.client.HTTPSConnection(origin.hostname, origin.port, timeout=PROBE_REQUEST_TIMEOUT,
+                                                         context=get_dev_ssl_context())
+            else:
+                connection = http.client.HTTPConnection(origin.hostname, origin.port, timeout=PROBE_REQUEST_TIMEOUT)
+            local.connection = connection
+            with connections_lock:
+                connections.append(connection)
+        try:
+            connection.request("GET", path, headers={"Accept": accept})
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close() # Reconnects on the next request
+            raise
+        content_type = response.getheader("Content-Type", "")
+        if response.status >= 400:
+            raise OSError(f"HTTP {response.status}")
+        return content_type, body.decode("utf-8", "replace")
+
+    def resolve(reference, base_path):
+        parsed = urllib.parse.urlsplit(urllib.parse.urljoin(base_path, reference))
+        if parsed.netloc and parsed.netloc != origin.netloc:
+            return None # Another server (CDN, analytics), not ours to warm
+        return parsed.path + (f"?{parsed.query}" if parsed.query else "")
+
+    seen = set()
+    warmed = failed = queued = 0 # queued: modules requested so far, not counting the entry page
+    entry_path = origin.path or "/"
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        pending = {executor.submit(fetch, entry_path, "text/html"): entry_path}
+        seen.add(entry_path)
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = concurrent.futures.wait(pending, timeout=remaining, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    content_type, body = future.result()
+                except (OSError, http.client.HTTPException):
+                    failed += 1
+                    continue
+                if path == entry_path:
+                    references = find_entry_references(body) if "html" in content_type else []
+                else:
+                    warmed += 1
+                    references = find_module_imports(body) if "javascript" in content_type else []
+                for reference in references:
+                    module_path = resolve(reference, path)
+                    if module_path is None or module_path in seen or queued >= max_modules:
+                        continue
+                    seen.add(module_path)
+                    queued += 1
+                    pending[executor.submit(fetch, module_path, "*/*")] = module_path
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+        with connections_lock:
+            for connection in connections:
+                connection.close()
+    return warmed, failed, time.monotonic() - start
+
+def prewarm_before_opening(url, label=""):
+    """
+    Runs prewarm_dev_server for url (when PREWARM_MODULES is on) and reports the result.
+    """
+    if not PREWARM_MODULES:
+        return
+    print(f"{label}Pre-warming the dev server's modules...")
+    with trace_span("prewarm", url=url) as span:
+        warmed, failed, elapsed = prewarm_dev_server(url)
+        span.update(modules=warmed, failed=failed)
+    print(f"{label}Pre-warmed {warmed} module{'s' if warmed != 1 else ''} in {elapsed:.2f}s"
+          + (f" ({failed} request{'s' if failed != 1 else ''} failed)." if failed else "."))
+
+# --- Package manager detection ---
+
+# Lockfile -> package manager, in the order they are checked
+LOCKFILES = [
+    ("pnpm-lock.yaml", "pnpm"),
+    ("yarn.lock", "yarn"),
+    ("bun.lockb", "bun"),
+    ("bun.lock", "bun"),
+    ("npm-shrinkwrap.json", "npm"),
+    ("package-lock.json", "npm"),
+]
+PACKAGE_MANAGERS = ["npm", "pnpm", "yarn", "bun"]
+
+def read_package_json(project_dir):
+    """
+    Returns the parsed package.json of project_dir, or None if it is missing or invalid.
+    """
+    try:
+        with open(os.path.join(project_dir, "package.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+def detect_package_manager(project_dir):
+    """
+    Returns the package manager the project uses ('npm', 'pnpm', 'yarn' or 'bun').
+    The "packageManager" field of package.json (used by Corepack) wins, then the
+    lockfile decides. Defaults to npm.
+    """
+    package = read_package_json(project_dir) or {}
+    declared = str(package.get("packageManager") or "").split("@", 1)[0]
+    if declared in PACKAGE_MANAGERS:
+        return declared
+    for lockfile, manager in LOCKFILES:
+        if os.path.isfile(os.path.join(project_dir, lockfile)):
+            return manager
+    return "npm"
+
+def find_npm_lockfile(project_dir):
+    """
+    Returns the path of the project's npm lockfile (npm-shrinkwrap.json wins
+    over package-lock.json, as it does for npm), or None if there is none.
+    """
+    for name in ("npm-shrinkwrap.json", "package-lock.json"):
+        path = os.path.join(project_dir, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+def resolve_command(command):
+    """
+    Replaces the program name in an argument list with its full path, so it can
+    run without a shell (this also finds npm.cmd & co. on Windows).
+    Raises FileNotFoundError if the program isn't on the PATH.
+    """
+    executable = shutil.which(command[0])
+    if executable is None:
+        raise FileNotFoundError(command[0])
+    return [executable] + list(command[1:])
+
+def get_dev_command(manager):
+    """
+    Returns the command that starts the dev server: DEV_COMMAND, a shell
+    command line, or else the argument list of '<manager> run dev', which runs
+    without an extra shell.
+    """
+    return DEV_COMMAND or [manager, "run", "dev"]
+
+def format_command(command):
+    """
+    Returns a dev command (see get_dev_command) as one shell command line, for
+    messages and terminal windows.
+    """
+    if isinstance(command, str):
+        return command
+    if platform.system() == "Windows":
+        return subprocess.list2cmdline(command)
+    return " ".join(shlex.quote(arg) for arg in command)
+
+def get_popen_arguments(command):
+    """
+    Returns the subprocess.Popen arguments that run a dev command: a shell
+    command line through the shell, an argument list directly.
+    Raises FileNotFoundError if the program of an argument list isn't on the PATH.
+    """
+    if isinstance(command, str):
+        return {"args": command, "shell": True}
+    return {"args": resolve_command(command)}
+
+# --- Dependency fingerprint ---
+# Instead of "node_modules exists, so skip the install" we remember a fingerprint
+# of everything the install depended on (package.json, the lockfile and the
+# Node/package manager versions). The cheap os.stat() data is compared first; files are only
+# re-hashed and tools only re-queried when their stat data changed.
+
+DEPENDENCY_FILES = ["package.json"] + [lockfile for lockfile, _ in LOCKFILES]
+
+def write_json_atomically(path, data):
+    """
+    Writes data as JSON to a temporary file first and then moves it into
+    place, so readers (possibly in another thread or process) never see a
+    half-written file. Raises OSError.
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+def stat_signature(path):
+    """
+    Returns [mtime_ns, size] for the given path, or None if it doesn't exist.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def hash_file(path):
+    """
+    Returns the SHA-256 hex digest of the given file.
+    """
+    import hashlib # Only needed when the cheap stat() check can't decide
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_tool_version(tool_path):
+    """
+    Runs '<tool> --version' and returns the trimmed output, or None on failure.
+    """
+    try:
+        result = subprocess.run(
+            [tool_path, "--version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+            timeout=15
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+def get_toolchain_entry(tool_path, previous=None):
+    """
+    Returns the fingerprint entry {"path", "stat", "version"} of a tool. The
+    version from 'previous' (an earlier entry) is reused while the executable
+    is unchanged, since asking npm for its version takes a few hundred ms.
+    """
+    # node/npm & co. are frequently symlinks (nvm, Homebrew, ...); the target's stat
+    # data changes when the version switches, the link's own data may not.
+    real_path = os.path.realpath(tool_path)
+    signature = stat_signature(real_path)
+    if previous and previous.get("path") == real_path and previous.get("stat") == signature:
+        version = previous["version"]
+    else:
+        version = get_tool_version(tool_path)
+    return {"path": real_path, "stat": signature, "version": version}
+
+def get_toolchain(project_dir, previous=None):
+    """
+    Returns the fingerprint entries {tool: entry} of node and the project's
+    package manager (see get_toolchain_entry); the entry is None for a tool
+    that isn't on the PATH. Versions are reused from the toolchain of
+    'previous' (an earlier fingerprint) where possible.
+    """
+    previous_tools = (previous or {}).get("toolchain") or {}
+    toolchain = {}
+    for tool in ("node", detect_package_manager(project_dir)):
+        tool_path = shutil.which(tool)
+        toolchain[tool] = get_toolchain_entry(tool_path, previous_tools.get(tool)) if tool_path else None
+    return toolchain
+
+def compute_dependency_fingerprint(project_dir, previous=None, toolchain=None):
+    """
+    Builds the fingerprint dictionary for the project's dependency inputs.
+    Hashes and tool versions from 'previous' are reused for every entry whose
+    stat signature hasn't changed, so an unchanged project costs only a few stats.
+    toolchain (see get_toolchain) is used instead of looking up the tools again.
+    """
+    previous = previous or {}
+    previous_files = previous.get("files", {})
+    fingerprint = {"files": {}}
+
+    # Workspace packages are installed by the root install, so their manifests count too
+    workspace_manifests = [
+        os.path.relpath(os.path.join(d, "package.json"), project_dir).replace(os.sep, "/")
+        for d in find_workspace_dirs(project_dir)
+    ]
+
+    for name in DEPENDENCY_FILES + workspace_manifests:
+        path = os.path.join(project_dir, name)
+        signature = stat_signature(path)
+        if signature is None:
+            continue
+        old = previous_files.get(name)
+        if old and old.get("stat") == signature:
+            sha256 = old["sha256"]
+        else:
+            sha256 = hash_file(path)
+        fingerprint["files"][name] = {"stat": signature, "sha256": sha256}
+
+    fingerprint["toolchain"] = dict(toolchain) if toolchain is not None else get_toolchain(project_dir, previous)
+
+    hidden_lockfile = os.path.join(project_dir, "node_modules", ".package-lock.json")
+    fingerprint["hidden_lockfile"] = stat_signature(hidden_lockfile)
+    return fingerprint
+
+def load_dependency_fingerprint(project_dir):
+    """
+    Returns the fingerprint saved by the last successful install, or None.
+    """
+    path = os.path.join(project_dir, "node_modules", FINGERPRINT_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+def save_dependency_fingerprint(project_dir, fingerprint):
+    """
+    Writes the fingerprint into node_modules so it disappears together with it.
+    """
+    path = os.path.join(project_dir, "node_modules", FINGERPRINT_FILE)
+    try:
+        # npm doesn't create node_modules for projects without dependencies
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_json_atomically(path, fingerprint) # The pre-flight checks may be reading it
+    except OSError as e:
+        print(f"Warning: could not save dependency fingerprint ({e}).")
+
+def hidden_lockfile_matches(project_dir):
+    """
+    Compares node_modules/.package-lock.json (written by npm after every install)
+    with the project's lockfile. A missing or mismatching hidden lockfile means
+    the last install was interrupted or node_modules was modified by hand.
+    Returns True when they agree or when there is nothing to compare against.
+    """
+    lockfile_path = find_npm_lockfile(project_dir)
+    if lockfile_path is None:
+        return True # No lockfile, nothing to compare
+
+    hidden_path = os.path.join(project_dir, "node_modules", ".package-lock.json")
+    try:
+        with open(lockfile_path, "r", encoding="utf-8") as f:
+            lock_packages = json.load(f).get("packages")
+        with open(hidden_path, "r", encoding="utf-8") as f:
+            hidden_packages = json.load(f).get("packages", {})
+    except (OSError, ValueError, AttributeError):
+        return False
+
+    if lock_packages is None:
+        return True # lockfileVersion 1 has no "packages" section to compare
+
+    for key, entry in hidden_packages.items():
+        expected = lock_packages.get(key)
+        if expected is None or expected.get("version") != entry.get("version"):
+            return False
+
+    for key, entry in lock_packages.items():
+        # Only installed paths are interesting; optional packages may be
+        # legitimately skipped (e.g. binaries for other platforms).
+        if "node_modules/" not in key or entry.get("optional"):
+            continue
+        if key not in hidden_packages:
+            return False
+    return True
+
+def check_dependencies_fresh(project_dir, toolchain=None):
+    """
+    Decides whether node_modules is up to date with the project's dependency
+    inputs. toolchain is passed on to compute_dependency_fingerprint.
+    Returns a tuple (is_fresh, reason).
+    """
+    if not os.path.isdir(os.path.join(project_dir, "node_modules")):
+        return False, "node_modules directory not found"
+
+    saved = load_dependency_fingerprint(project_dir)
+    current = compute_dependency_fingerprint(project_dir, previous=saved, toolchain=toolchain)
+
+    if saved is None:
+        # node_modules was installed before dev-starter started keeping
+        # fingerprints. Trust it if npm's own record agrees with the lockfile.
+        if current["hidden_lockfile"] is not None and hidden_lockfile_matches(project_dir):
+            save_dependency_fingerprint(project_dir, current)
+            return True, "node_modules matches the lockfile"
+        return False, "no install fingerprint found"
+
+    saved_files = saved.get("files", {})
+    for name in sorted(set(saved_files) | set(current["files"])):
+        old = saved_files.get(name)
+        new = current["files"].get(name)
+        if (old is None) != (new is None):
+            return False, f"{name} was {'added' if new else 'removed'} since the last install"
+        if old and old.get("sha256") != new["sha256"]:
+            return False, f"{name} changed since the last install"
+
+    saved_tools = saved.get("toolchain", {})
+    for tool in sorted(set(saved_tools) | set(current["toolchain"])):
+        old_version = (saved_tools.get(tool) or {}).get("version")
+        new_version = (current["toolchain"].get(tool) or {}).get("version")
+        if tool not in current["toolchain"] or tool not in saved_tools:
+            return False, "the package manager changed since the last install"
+        if old_version != new_version:
+            return False, f"{tool} version changed ({old_version} -> {new_version})"
+
+    if current["hidden_lockfile"] != saved.get("hidden_lockfile"):
+        # Only parse the (possibly large) lockfiles when npm's record has changed.
+        if not hidden_lockfile_matches(project_dir):
+            return False, "node_modules does not match the lockfile (partial or modified install?)"
+
+    if current != saved:
+        save_dependency_fingerprint(project_dir, current) # Refresh stat data, skip re-hashing next time
+    return True, "fingerprint unchanged"
+
+# --- Install strategy ---
+# Picks the install command per package manager. Cached/offline installs skip
+# most network round-trips, and 'npm ci' skips dependency resolution when
+# node_modules has to be created from scratch anyway.
+
+def is_ci():
+    """
+    Returns True when running on a CI server (the CI environment variable is set).
+    """
+    return os.environ.get("CI", "").lower() not in ("", "0", "false")
+
+def get_npm_cache_dir():
+    """
+    Returns npm's cache directory (npm_config_cache or npm's platform default).
+    """
+    configured = os.environ.get("npm_config_cache") or os.environ.get("NPM_CONFIG_CACHE")
+    if configured:
+        return configured
+    if platform.system() == "Windows":
+        return os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "npm-cache")
+    return os.path.join(os.path.expanduser("~"), ".npm")
+
+def npm_cache_has_lockfile(project_dir):
+    """
+    Checks whether every package in the npm lockfile is already in npm's local
+    cache, by looking up each package's integrity hash in the cache's content
+    store. Returns False whenever that can't be confirmed.
+    """
+    lockfile_path = find_npm_lockfile(project_dir)
+    content_dir = os.path.join(get_npm_cache_dir(), "_cacache", "content-v2")
+    if lockfile_path is None or not os.path.isdir(content_dir):
+        return False
+
+    try:
+        with open(lockfile_path, "r", encoding="utf-8") as f:
+            packages = json.load(f).get("packages")
+    except (OSError, ValueError, AttributeError):
+        return False
+    if not packages:
+        return False
+
+    for key, entry in packages.items():
+        if "node_modules/" not in key or entry.get("link") or entry.get("inBundle") or entry.get("optional"):
+            continue
+        integrity = entry.get("integrity")
+        if not integrity:
+            return False # git/tarball dependencies without a hash, can't tell
+        algorithm, _, digest = integrity.split()[0].partition("-")
+        try:
+            hex_digest = binascii.a2b_base64(digest).hex()
+        except ValueError:
+            return False
+        if not os.path.isfile(os.path.join(content_dir, algorithm, hex_digest[:2], hex_digest[2:4], hex_digest[4:])):
+            return False
+    return True
+
+def choose_install_strategy(project_dir, manager):
+    """
+    Picks the fastest install command for the project and package manager.
+    Returns a tuple (reason, command, fallback_command). command and
+    fallback_command are argument lists; fallback_command is tried if command
+    fails (e.g. 'npm ci' with an out-of-sync lockfile) and may be None.
+    """
+    ci = is_ci()
+    has_node_modules = os.path.isdir(os.path.join(project_dir, "node_modules"))
+
+    if manager == "npm":
+        no_extras = ["--no-audit", "--no-fund"] # Both cost an extra network round-trip
+        if find_npm_lockfile(project_dir) is None:
+            return "no lockfile", ["npm", "install"] + no_extras, None
+
+        if npm_cache_has_lockfile(project_dir):
+            cache_flag, reason = "--offline", "every locked package is in the npm cache"
+        else:
+            cache_flag, reason = "--prefer-offline", "using the npm cache where possible"
+        fallback = ["npm", "install", "--prefer-offline"] + no_extras
+
+        if ci or not has_node_modules:
+            # 'npm ci' always starts from an empty node_modules, so only use it when there is nothing to keep
+            reason += ", CI" if ci else ", fresh node_modules"
+            return reason, ["npm", "ci", cache_flag] + no_extras, fallback
+        command = ["npm", "install", cache_flag] + no_extras
+        return reason, command, (fallback if command != fallback else None)
+
+    if manager == "pnpm":
+        command = ["pnpm", "install", "--prefer-offline"]
+        if ci:
+            command.append("--frozen-lockfile")
+        return "pnpm lockfile", command, None
+
+    if manager == "yarn":
+        if os.path.isfile(os.path.join(project_dir, ".yarnrc.yml")): # Yarn 2+ (Berry)
+            command = ["yarn", "install"] + (["--immutable"] if ci else [])
+        else:
+            command = ["yarn", "install", "--prefer-offline"] + (["--frozen-lockfile"] if ci else [])
+        return "yarn lockfile", command, None
+
+    command = ["bun", "install"] + (["--frozen-lockfile"] if ci else [])
+    return "bun lockfile", command, None
+
+# --- Streaming command output ---
+
+def run_streaming_command(command, cwd, label, tail_lines=None, status_interval=1.0):
+    """
+    Runs a command (an argument list, or a string to run through the shell), forwarding its output line by line as it arrives
+    instead of buffering it. Only the last 'tail_lines' lines are kept (for
+    error reports), so memory use doesn't grow with the amount of output.
+    While the command runs, an elapsed-time indicator is shown.
+    tail_lines defaults to INSTALL_LOG_TAIL_LINES.
+    Returns a tuple (returncode, tail) where tail is a list of the last lines.
+    """
+    tail = collections.deque(maxlen=INSTALL_LOG_TAIL_LINES if tail_lines is None else tail_lines)
+    interactive = sys.stdout.isatty()
+    print_lock = threading.Lock()
+    finished = threading.Event()
+    start_time = time.time()
+    status = {"shown": False, "last": start_time}
+
+    def show_status():
+        elapsed = time.time() - start_time
+        if interactive:
+            # Redraw a single status line in place
+            sys.stdout.write(f"\r[{label}] running... {elapsed:.0f}s ")
+            status["shown"] = True
+        elif time.time() - status["last"] >= 10:
+            sys.stdout.write(f"[{label}] still running... {elapsed:.0f}s\n")
+            status["last"] = time.time()
+        sys.stdout.flush()
+
+    def clear_status():
+        if status["shown"]:
+            sys.stdout.write("\r" + " " * (len(label) + 20) + "\r")
+            status["shown"] = False
+
+    def ticker():
+        while not finished.wait(status_interval):
+            with print_lock:
+                show_status()
+
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT, # One stream keeps stdout/stderr lines in their original order
+        universal_newlines=True,
+        errors="replace",
+        bufsize=1,
+        shell=isinstance(command, str)
+    )
+    ticker_thread = threading.Thread(target=ticker, daemon=True)
+    ticker_thread.start()
+    try:
+        for line in process.stdout:
+            line = line.rstrip("\r\n")
+            tail.append(line)
+            with print_lock:
+                clear_status()
+                print(f"  {line}")
+                status["last"] = time.time()
+        returncode = process.wait()
+    except KeyboardInterrupt:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        finished.set()
+        ticker_thread.join()
+        with print_lock:
+            clear_status()
+
+    print(f"[{label}] finished in {time.time() - start_time:.1f}s (exit code {returncode}).")
+    return returncode, list(tail)
+
+def check_and_run_npm_install(project_dir, freshness=None):
+    """
+    Checks whether node_modules is up to date with package.json, the lockfile and
+    the installed Node/package manager versions. If not, installs dependencies with
+    the project's package manager (npm, pnpm, yarn or bun) using the fastest
+    suitable strategy (see choose_install_strategy). freshness is the result of
+    check_dependencies_fresh if that already ran (see the pre-flight checks).
+    Returns True on success or if dependencies are already up to date, False on failure.
+    """
+    package_json_path = os.path.join(project_dir, "package.json")
+
+    if not os.path.isfile(package_json_path):
+        print(f"\nError: '{package_json_path}' not found in the current directory.")
+        print("This doesn't seem to be a Node.js project. Cannot run 'npm install'.")
+        return False
+
+    manager = detect_package_manager(project_dir)
+    if freshness is None:
+        with trace_span("install_check") as span:
+            freshness = check_dependencies_fresh(project_dir)
+            span["fresh"] = freshness[0]
+    is_fresh, reason = freshness
+    if is_fresh:
+        print(f"Dependencies are up to date ({reason}). Skipping '{manager} install'.")
+        return True
+    else:
+        strategy, command, fallback = choose_install_strategy(project_dir, manager)
+        print(f"Dependencies need installing: {reason}.")
+        print(f"Install strategy: '{' '.join(command)}' ({strategy})")
+        try:
+            # The package manager is run directly (resolved with shutil.which, which
+            # also finds 'npm.cmd' on Windows) instead of through an extra shell.
+            # Output is streamed as it arrives rather than captured until the end.
+            start_time = time.time()
+            with trace_span("install", command=" ".join(command)):
+                returncode, tail = run_streaming_command(resolve_command(command), project_dir, command[0])
+            if returncode != 0 and fallback:
+                print(f"'{' '.join(command)}' failed. Retrying with '{' '.join(fallback)}'...")
+                command = fallback
+                with trace_span("install", command=" ".join(command)):
+                    returncode, tail = run_streaming_command(resolve_command(command), project_dir, command[0])
+            if returncode != 0:
+                print(f"\nError: '{manager} install' failed with exit code {returncode}.")
+                print(f"Command: {' '.join(command)}")
+                if tail:
+                    print(f"\n--- last {len(tail)} lines of {manager} install output ---")
+                    print("\n".join(tail))
+                    print("--------------------------\n")
+                print(f"\nPlease check the errors above. Cannot proceed with '{manager} run dev'.")
+                return False
+            print(f"Dependencies installed with '{' '.join(command)}' in {time.time() - start_time:.1f}s.")
+            save_dependency_fingerprint(project_dir, compute_dependency_fingerprint(project_dir))
+            return True
+        except FileNotFoundError:
+            print(f"\nError: '{manager}' command not found.")
+            if manager == "npm":
+                print("Please ensure Node.js is installed and in your system's PATH.")
+                print("You can download Node.js from https://nodejs.org/")
+            else:
+                print(f"This project uses {manager}. Install it (e.g. 'corepack enable' or 'npm install -g {manager}')")
+                print("and make sure it is in your system's PATH.")
+            return False
+        except Exception as e:
+            print(f"\nAn unexpected error occurred during '{manager} install': {e}")
+            return False
+
+# --- Running dev server state ---
+# While a dev server started by dev-starter is running, its --tee wrapper (or
+# the headless supervisor) keeps a small state file next to the log: PID and
+# start time as soon as the server is started, its URL and port once its
+# banner or the readiness poll found it. The next launch reads it and, if that
+# server is still alive and answering, just opens the browser again instead of
+# starting a second server on another port.
+
+def get_state_path(log_path):
+    """
+    Returns the path of the state file that belongs to a dev server log.
+    """
+    return os.path.splitext(log_path)[0] + ".json"
+
+def write_dev_server_state(state_path, pid, url, started_at):
+    """
+    Records a running dev server; url is None while it isn't known yet.
+    Written to a temporary file first, so readers never see a half-written state.
+    """
+    state = {
+        "pid": pid,
+        "url": url,
+        "port": urllib.parse.urlsplit(url).port if url else None,
+        "started_at": started_at,
+        "cwd": os.getcwd(),
+    }
+    try:
+        write_json_atomically(state_path, state)
+    except OSError as e:
+        print(f"Warning: could not save dev server state ({e}).")
+
+def load_dev_server_state(state_path):
+    """
+    Returns the saved dev server state, or None if there is none or it is invalid.
+    """
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or not isinstance(state.get("pid"), int):
+        return None
+    return state
+
+def record_dev_server_url(state_path, url, pid=None):
+    """
+    Fills in the URL of the recorded dev server, found by its banner or by
+    polling. With pid, only if the state file still describes that process.
+    """
+    state = load_dev_server_state(state_path)
+    if state is None or (pid is not None and state["pid"] != pid) or state.get("url") == url:
+        return
+    state.update(url=url, port=urllib.parse.urlsplit(url).port)
+    try:
+        write_json_atomically(state_path, state)
+    except OSError as e:
+        print(f"Warning: could not save dev server state ({e}).")
+
+def remove_dev_server_state(state_path, pid=None):
+    """
+    Deletes the state file; with 'pid', only if it still describes that process.
+    """
+    if pid is not None:
+        state = load_dev_server_state(state_path)
+        if state is not None and state["pid"] != pid:
+            return # A newer server has taken over the state file
+    try:
+        os.remove(state_path)
+    except OSError:
+        pass
+
+def is_process_alive(pid):
+    """
+    Returns True if a process with the given PID is running.
+    """
+    if platform.system() == "Windows":
+        import ctypes # Only needed on Windows
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x00100000, False, pid) # SYNCHRONIZE
+        if not handle:
+            return False
+        try:
+            return kernel32.WaitForSingleObject(handle, 0) == 0x102 # WAIT_TIMEOUT: still running
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0) # Signal 0 only checks that the process exists
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True # Exists, but belongs to another user
+    return True
+
+def find_running_dev_server(log_path):
+    """
+    Returns the saved state of a dev server started earlier with this log path
+    if its process is still alive and its URL answers, or None. Stale state
+    files (process gone) are removed.
+    """
+    state_path = get_state_path(log_path)
+    state = load_dev_server_state(state_path)
+    if state is None:
+        return None
+    if not is_process_alive(state["pid"]):
+        remove_dev_server_state(state_path)
+        return None
+    if not state.get("url"):
+        return None # Still starting, or where it listens was never found
+    if probe_url(state["url"], timeout=1) is None:
+        return None # Alive but not answering (hung, or the PID was reused); start a new one
+    return state
+
+# --- Terminal emulator discovery (Linux) ---
+# All candidates are resolved with one round of PATH lookups instead of trying
+# to start each one in turn, and the emulator that worked is cached per user
+# (together with the PATH and desktop session it worked in), so later launches
+# go straight to it.
+
+# Terminal emulators in order of preference: (name, option before the command, style)
+#   "argv":   the command is passed as separate arguments: <flag> bash -c <command>
+#   "string": the command is passed as a single string:   <flag> 'bash -c "<command>"'
+LINUX_TERMINALS = [
+    # '--' is used by some to signify end of options and start of command.
+    ("gnome-terminal", "--", "argv"),
+    ("konsole", "--", "argv"),
+    ("xfce4-terminal", "--command", "argv"),
+    ("terminator", "-e", "string"), # Terminator needs it as a single string
+    ("lxterminal", "-e", "string"), # Lxterminal needs it as a single string
+    # For xterm and generic x-terminal-emulator:
+    # They use '-e' to execute a single command string.
+    ("xterm", "-e", "string"),
+    ("x-terminal-emulator", "-e", "string"),
+]
+
+# Environment that decides which terminal works; the cache is ignored when any of it changes
+TERMINAL_CACHE_KEYS = ["PATH", "DISPLAY", "WAYLAND_DISPLAY", "XDG_SESSION_TYPE", "XDG_CURRENT_DESKTOP"]
+
+# How long a newly discovered terminal gets to fail (e.g. "cannot open display")
+# before it counts as working (in seconds)
+TERMINAL_CHECK_WINDOW = 0.15
+
+def get_terminal_cache_path():
+    """
+    Returns the per-user file that remembers the working terminal emulator.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "dev-starter", "terminal.json")
+
+def load_cached_terminal():
+    """
+    Returns the cached terminal (a dictionary with name, path, flag and style) if
+    it was found in the current PATH and desktop session and still exists, or None.
+    """
+    try:
+        with open(get_terminal_cache_path(), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("session") != {key: os.environ.get(key, "") for key in TERMINAL_CACHE_KEYS}:
+        return None
+    if not os.access(cached.get("path") or "", os.X_OK):
+        return None
+    return cached
+
+def save_cached_terminal(terminal):
+    """
+    Remembers a terminal that worked, for the current PATH and desktop session.
+    """
+    path = get_terminal_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(terminal, session={key: os.environ.get(key, "") for key in TERMINAL_CACHE_KEYS}), f, indent=2)
+    except OSError:
+        pass # Only a cache
+
+def forget_cached_terminal():
+    """
+    Removes the cached terminal, e.g. after it failed to start.
+    """
+    try:
+        os.remove(get_terminal_cache_path())
+    except OSError:
+        pass
+
+def discover_terminals():
+    """
+    Returns every installed terminal emulator from LINUX_TERMINALS, in order of preference.
+    """
+    found = []
+    for name, flag, style in LINUX_TERMINALS:
+        path = shutil.which(name)
+        if path:
+            found.append({"name": name, "path": path, "flag": flag, "style": style})
+    return found
+
+def get_display_problem():
+    """
+    Checks that there is a graphical session a terminal window can open on.
+    Returns None if there seems to be one, or a short description of the problem.
+    """
+    wayland = os.environ.get("WAYLAND_DISPLAY")
+    if wayland:
+        socket_path = wayland if os.path.isabs(wayland) else os.path.join(os.environ.get("XDG_RUNTIME_DIR", ""), wayland)
+        if os.path.exists(socket_path):
+            return None
+
+    display = os.environ.get("DISPLAY")
+    if display:
+        host, _, screen = display.rpartition(":")
+        number = screen.split(".")[0]
+        if host in ("", "unix") and number.isdigit() and not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            return f"X display {display} is not running"
+        return None # Local display with a socket, or a forwarded one (ssh -X) we can't check cheaply
+
+    if wayland:
+        return f"Wayland display {wayland} is not running"
+    return "neither DISPLAY nor WAYLAND_DISPLAY is set"
+
+def get_terminal_problem():
+    """
+    Checks whether a new terminal window can be opened here. Returns None if
+    it looks like one can, or a short description of why not.
+    """
+    if platform.system() in ("Windows", "Darwin"):
+        return None
+    problem = get_display_problem()
+    if problem:
+        return problem
+    if load_cached_terminal() is None and not discover_terminals():
+        return "no supported terminal emulator is installed"
+    return None
+
+def build_terminal_command(terminal, shell_cmd_in_terminal):
+    """
+    Returns the argument list that opens 'terminal' running shell_cmd_in_terminal.
+    """
+    if terminal["style"] == "argv":
+        return [terminal["path"], terminal["flag"], "bash", "-c", shell_cmd_in_terminal]
+    return [terminal["path"], terminal["flag"], f"bash -c {shlex.quote(shell_cmd_in_terminal)}"]
+
+def launch_linux_terminal(shell_cmd_in_terminal, npm_command="npm run dev"):
+    """
+    Opens shell_cmd_in_terminal in the cached terminal emulator, or in the first
+    installed one that doesn't fail straight away. Returns the terminal's
+    process, or None if no terminal could be opened.
+    """
+    problem = get_display_problem()
+    if problem:
+        print(f"\nNo graphical session to open a terminal window in ({problem}).")
+        return None
+
+    cached = load_cached_terminal()
+    candidates = [cached] if cached else discover_terminals()
+    while candidates:
+        terminal = candidates.pop(0)
+        try:
+            with trace_span("terminal_attempt", emulator=terminal["name"], cached=terminal is cached):
+                process = subprocess.Popen(build_terminal_command(terminal, shell_cmd_in_terminal))
+                if terminal is not cached:
+                    # First use in this session: make sure it doesn't exit with an error right away
+                    try:
+                        process.wait(timeout=TERMINAL_CHECK_WINDOW)
+                    except subprocess.TimeoutExpired:
+                        pass
+        except OSError as e:
+            print(f"Error launching with {terminal['name']}: {e}")
+            process = None
+
+        if process is not None and not process.returncode:
+            print(f"Launched '{npm_command}' using: {terminal['name']} (Linux).")
+            if terminal is not cached:
+                save_cached_terminal(terminal)
+            return process
+
+        if process is not None:
+            print(f"{terminal['name']} exited with code {process.returncode}. Trying the next terminal...")
+        if terminal is cached:
+            forget_cached_terminal()
+            candidates = [t for t in discover_terminals() if t["name"] != cached["name"]]
+    return None
+
+# --- Dev server output watching ---
+# The dev server runs in its own terminal window, so we can't read its stdout
+# directly. Instead the new terminal runs dev-starter in "--tee" mode, which
+# starts the dev command, shows its output as usual and also copies it into a
+# log file that the launcher reads while waiting for the server.
+
+DEV_LOG_PATH = os.path.join(".dev-starter", "dev-server.log")
+EXIT_MARKER = "[dev-starter] dev server exited with code"
+
+# Strips colour codes; Vite for example prints the port in bold
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+# Banner lines printed by common dev servers once they are listening:
+#   Vite / Vue CLI / CRA / Next 13+:  "Local:   http://localhost:5173/"
+#   Next 12:                          "started server on 0.0.0.0:3000, url: http://localhost:3000"
+#   Angular:                          "open your browser on http://localhost:4200/"
+BANNER_PATTERNS = [
+    re.compile(r"Local:\s+(https?://[^\s,]+)"),
+    re.compile(r"started server on .*?, url: (https?://[^\s,]+)"), # Not just "url:", which other log lines print too
+    re.compile(r"open your browser on\s+(https?://[^\s,]+)"),
+]
+
+def create_log_dir(log_path):
+    """
+    Creates the directory of log_path (.dev-starter/ in the project) with a
+    .gitignore that ignores everything in it, so the log and state files
+    don't show up in the project's git status.
+    """
+    log_dir = os.path.dirname(log_path)
+    if not log_dir:
+        return
+    os.makedirs(log_dir, exist_ok=True)
+    gitignore_path = os.path.join(log_dir, ".gitignore")
+    if not os.path.exists(gitignore_path):
+        try:
+            with open(gitignore_path, "w", encoding="utf-8") as f:
+                f.write("# Created by dev-starter: its logs and state are local to this machine\n*\n")
+        except OSError:
+            pass # Only cosmetic
+
+def tee_dev_server_output(log_path, command):
+    """
+    Runs the dev command (see get_dev_command), forwarding its output to this
+    terminal and to log_path. Returns the dev command's exit code.
+    """
+    create_log_dir(log_path)
+
+    # Output goes through a pipe now, ask the tools to keep their colours anyway
+    env = dict(os.environ, FORCE_COLOR="1")
+    with open(log_path, "wb") as log:
+        try:
+            # A shell reports a missing program itself (exit code 127)
+            process = subprocess.Popen(**get_popen_arguments(command), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env)
+        except FileNotFoundError:
+            print(f"Error: '{command[0]}' command not found. Please ensure it is in your system's PATH.")
+            log.write(f"\n{EXIT_MARKER} 127\n".encode())
+            return 127
+        state_path = get_state_path(log_path)
+        # Remember the server so the next launch can re-attach to it; the URL follows with the banner
+        write_dev_server_state(state_path, process.pid, None, time.time())
+        pending = b"" # Output not yet scanned for the banner; None once it was found
+        try:
+            # read1() returns whatever is available, so partial lines (prompts) show up immediately
+            for chunk in iter(lambda: process.stdout.read1(65536), b""):
+                sys.stdout.buffer.write(chunk)
+                sys.stdout.buffer.flush()
+                log.write(chunk)
+                log.flush()
+                if pending is not None:
+                    url, pending = scan_output_for_banner(pending, chunk, state_path, process.pid)
+                    if url:
+                        pending = None
+        except KeyboardInterrupt:
+            pass # Ctrl-C reaches the dev server too; just wait for it to finish
+        finally:
+            returncode = process.wait()
+            remove_dev_server_state(state_path, process.pid)
+        log.write(f"\n{EXIT_MARKER} {returncode}\n".encode())
+    return returncode
+
+def build_dev_server_command(npm_command, log_path):
+    """
+    Returns the shell command the new terminal should run: dev-starter in
+    '--tee' mode wrapping npm_command. A shell command line is passed as one
+    argument and run through a shell by the wrapper, so shell syntax ('&&',
+    variable assignments, ...) stays inside it; an argument list follows '--'
+    and runs directly. A relative log_path is relative to the directory the
+    terminal starts in.
+    """
+    # Run the package directory itself, so this works whether or not dev-starter is installed
+    package_path = os.path.dirname(os.path.abspath(__file__))
+    wrapped = [npm_command] if isinstance(npm_command, str) else ["--"] + list(npm_command)
+    return format_command([sys.executable, package_path, "--tee", log_path] + wrapped)
+
+def get_terminal_command(npm_command, log_path):
+    """
+    Returns the command the new terminal should run: npm_command wrapped in
+    '--tee' mode (see build_dev_server_command) when its output is watched or
+    the server is to be re-used later (the wrapper records it in the state
+    file), else npm_command itself. Clears an earlier server's log and state first.
+    """
+    if not (WATCH_DEV_SERVER_OUTPUT or REUSE_RUNNING_SERVER):
+        return format_command(npm_command)
+    reset_dev_server_log(log_path)
+    remove_dev_server_state(get_state_path(log_path))
+    return build_dev_server_command(npm_command, log_path)
+
+def reset_dev_server_log(log_path):
+    """
+    Removes an old dev server log so its banner isn't mistaken for the new server's.
+    """
+    try:
+        os.remove(log_path)
+    except OSError:
+        pass
+
+def find_banner_url(line):
+    """
+    Returns the URL announced in a dev server banner line, or None.
+    """
+    line = ANSI_ESCAPE.sub("", line)
+    for pattern in BANNER_PATTERNS:
+        match = pattern.search(line)
+        if match:
+            return match.group(1)
+    return None
+
+def scan_output_for_banner(pending, data, state_path, pid):
+    """
+    Scans the next chunk of a dev server's output for its banner; pending is
+    the incomplete last line of the chunks before (b"" at first). A banner's
+    URL is recorded in the state file of the server's process pid, so the next
+    launch can re-attach to it. Used by the --tee wrapper and headless mode.
+    Returns a tuple (url or None, pending for the next chunk).
+    """
+    lines = (pending + data).split(b"\n")
+    pending = lines.pop()[-4096:]
+    for line in lines:
+        url = find_banner_url(line.decode("utf-8", "replace"))
+        if url:
+            record_dev_server_url(state_path, url, pid)
+            return url, b""
+    return None, pending
+
+def wait_for_dev_server_banner(log_path, timeout=None, poll_interval=0.05, terminal_process=None, stop=None):
+    """
+    Follows the dev server log until a banner line announces the server's URL
+    (for up to timeout seconds, BANNER_WAIT_TIMEOUT by default), or until the
+    threading.Event 'stop' is set and everything logged so far was read.
+    Returns a tuple (url, exit_code): url is None if no banner was seen,
+    exit_code is set if the dev server (or, before the log appeared, the
+    terminal_process that was to start it) exited in the meantime.
+    """
+    timeout = BANNER_WAIT_TIMEOUT if timeout is None else timeout
+    print(f"\nWaiting for the dev server to announce its URL (up to {timeout}s)...")
+    deadline = time.time() + timeout
+    log = None
+    pending = ""
+    try:
+        while time.time() < deadline:
+            stopped = stop is not None and stop.is_set() # Checked before reading, so a banner already logged still counts
+            if log is None:
+                try:
+                    log = open(log_path, "r", encoding="utf-8", errors="replace")
+                except OSError:
+                    if stopped:
+                        break
+                    # Terminal hasn't started the wrapper yet; give up if the terminal itself failed
+                    if terminal_process is not None and terminal_process.poll():
+                        print(f"The terminal exited with code {terminal_process.returncode} before starting the dev server.")
+                        forget_cached_terminal()
+                        return None, terminal_process.returncode
+                    time.sleep(poll_interval)
+                    continue
+
+            chunk = log.read()
+            if not chunk:
+                if stopped:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            pending += chunk
+            lines = pending.split("\n")
+            pending = lines.pop() # Keep the incomplete last line for the next read
+            for line in lines:
+                if line.startswith(EXIT_MARKER):
+                    return None, int(line[len(EXIT_MARKER):].strip() or 1)
+                url = find_banner_url(line)
+                if url:
+                    return url, None
+    finally:
+        if log is not None:
+            log.close()
+    return None, None
+
+# --- Workspaces (monorepos) ---
+
+def read_pnpm_workspace_patterns(project_dir):
+    """
+    Returns the 'packages' globs from pnpm-workspace.yaml. Only the simple list
+    form pnpm documents is understood, so no YAML library is needed.
+    """
+    patterns = []
+    try:
+        with open(os.path.join(project_dir, "pnpm-workspace.yaml"), "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return patterns
+
+    in_packages = False
+    for line in lines:
+        stripped = line.split("#", 1)[0].strip()
+        if not stripped:
+            continue
+        if not line[0].isspace() and not stripped.startswith("-"):
+            in_packages = stripped == "packages:"
+            continue
+        if in_packages and stripped.startswith("-"):
+            patterns.append(stripped[1:].strip().strip("'\""))
+    return patterns
+
+def find_workspace_dirs(project_dir):
+    """
+    Returns the directories of all workspace packages declared by the project
+    (package.json "workspaces" or pnpm-workspace.yaml), sorted by path.
+    """
+    package = read_package_json(project_dir) or {}
+    patterns = package.get("workspaces") or []
+    if isinstance(patterns, dict): # Yarn's {"packages": [...], "nohoist": [...]} form
+        patterns = patterns.get("packages") or []
+    patterns = list(patterns) + read_pnpm_workspace_patterns(project_dir)
+
+    import glob # Only needed for monorepos
+    included, excluded = set(), set()
+    for pattern in patterns:
+        target = excluded if pattern.startswith("!") else included
+        for path in glob.glob(os.path.join(project_dir, pattern.lstrip("!")), recursive=True):
+            if "node_modules" not in path.split(os.sep) and os.path.isfile(os.path.join(path, "package.json")):
+                target.add(os.path.normpath(path))
+    included.discard(os.path.normpath(project_dir))
+    return sorted(included - excluded)
+
+def find_dev_port(dev_script):
+    """
+    Returns the port passed to a dev script with --port/-p (e.g. "vite --port 3001"),
+    or LOCALHOST_PORT if there is none.
+    """
+    match = re.search(r"(?:--port|-p)[=\s]+(\d+)", dev_script or "")
+    return int(match.group(1)) if match else LOCALHOST_PORT
+
+def find_workspace_apps(project_dir):
+    """
+    Returns a list of (name, directory, port) for every workspace package with a "dev" script.
+    """
+    apps = []
+    for workspace_dir in find_workspace_dirs(project_dir):
+        package = read_package_json(workspace_dir) or {}
+        dev_script = (package.get("scripts") or {}).get("dev")
+        if dev_script:
+            name = package.get("name") or os.path.basename(workspace_dir)
+            apps.append((name, workspace_dir, find_dev_port(dev_script)))
+    return apps
+
+def get_workspace_log_path(project_dir, name):
+    """
+    Returns the dev server log path for the workspace app 'name'.
+    """
+    log_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+    return os.path.join(project_dir, ".dev-starter", f"dev-server-{log_name}.log")
+
+def launch_workspace_app(project_dir, name, app_dir, port, npm_command=("npm", "run", "dev")):
+    """
+    Launches one workspace app in its own terminal, waits for it and opens the
+    browser as soon as it is ready. Returns the ready URL or None.
+    """
+    log_path = get_workspace_log_path(project_dir, name)
+    fallback_url = f"http://localhost:{port}/"
+
+    running = attach_to_running_server(log_path, f"[{name}] ") if REUSE_RUNNING_SERVER else None
+    if running:
+        return running["url"]
+
+    if CHECK_PORT_CONFLICTS and scan_ports([port]):
+        report_port_owner(port, f"[{name}] ")
+
+    terminal_command = get_terminal_command(npm_command, log_path)
+
+    print(f"[{name}] Launching '{format_command(npm_command)}' in {app_dir}...")
+    terminal_process = launch_in_new_terminal(app_dir, terminal_command, format_command(npm_command))
+    if terminal_process is None:
+        print(f"[{name}] Failed to launch the dev server.")
+        return None
+
+    ready_url = wait_for_dev_server(log_path, fallback_url, terminal_process, name=name)
+    if ready_url:
+        prewarm_before_opening(ready_url, f"[{name}] ")
+        print(f"[{name}] Opening browser to {ready_url}...")
+        with trace_span("browser_open", url=ready_url, app=name):
+            open_browser(ready_url)
+    else:
+        print(f"[{name}] Dev server did not become ready. Check its terminal for errors.")
+    return ready_url
+
+def run_workspace_dev_servers(project_dir, apps, npm_command=("npm", "run", "dev")):
+    """
+    Launches all workspace apps at once and waits for their readiness in
+    parallel, so each browser tab opens as soon as that app is ready.
+    Returns a dictionary {name: ready URL or None}.
+    """
+    import concurrent.futures # Only needed for monorepos
+    print(f"\nLaunching {len(apps)} workspace apps: {', '.join(name for name, _, _ in apps)}")
+    results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(apps)) as executor:
+        futures = {
+            executor.submit(launch_workspace_app, project_dir, name, app_dir, port, npm_command): name
+            for name, app_dir, port in apps
+        }
+        for future in concurrent.futures.as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"[{name}] An unexpected error occurred: {e}")
+                results[name] = None
+    return results
+
+def run_headless_workspaces(project_dir, apps, npm_command=("npm", "run", "dev"), watch_dir=None):
+    """
+    Runs all workspace apps headless in this terminal (see run_headless),
+    re-using the ones that are already running. Returns the exit code for this script.
+    """
+    services = []
+    for name, app_dir, port in apps:
+        log_path = get_workspace_log_path(project_dir, name)
+        if REUSE_RUNNING_SERVER and attach_to_running_server(log_path, f"[{name}] "):
+            continue
+        if CHECK_PORT_CONFLICTS and scan_ports([port]):
+            report_port_owner(port, f"[{name}] ")
+        services.append(headless_service(name, app_dir, npm_command, log_path, f"http://localhost:{port}/"))
+    if not services:
+        return 0
+    print(f"\nRunning {len(services)} workspace apps: {', '.join(service['name'] for service in services)}")
+    return run_headless(services, watch_dir)
+
+def launch_in_new_terminal(working_dir, terminal_command, npm_command="npm run dev"):
+    """
+    Opens a new terminal window in working_dir running terminal_command
+    (OS-specific logic). npm_command is only used in messages.
+    Returns the process that opened the terminal, or None if none could be launched.
+    """
+    process_launched = False # Flag to track if any terminal launched successfully
+    terminal_process = None # The process that opens the terminal (watched while waiting for the server)
+
+    if platform.system() == "Windows":
+        # 'start cmd /k' opens a new cmd window and '/k' keeps it open
+        # 'call' ensures correct execution of npm within cmd
+        command = f'start cmd /k "call {terminal_command}"'
+        try:
+            # This already uses shell=True effectively, as 'start' is a shell command
+            with trace_span("terminal_attempt", emulator="cmd"):
+                terminal_process = subprocess.Popen(command, shell=True, cwd=working_dir)
+            print(f"Launched '{npm_command}' in a new Command Prompt window.")
+            process_launched = True
+        except Exception as e:
+            print(f"Error launching process on Windows: {e}")
+            print("Please ensure 'cmd' is available in your PATH.")
+
+    elif platform.system() == "Darwin": # macOS
+        # osascript tells the Terminal app to open a new tab/window and run commands
+        # 'cd \"{working_dir}\"': ensures correct directory, handles spaces in path
+        # '&& exec bash': keeps the terminal open after npm command finishes or crashes
+        # '( ... )': a DEV_COMMAND with its own '&&' / '||' stays one step
+        terminal_command_str = f'cd \\"{working_dir}\\" && ( {terminal_command} ) && exec bash'
+        command = f'tell application "Terminal" to do script "{terminal_command_str}" activate'
+        try:
+            with trace_span("terminal_attempt", emulator="Terminal.app"):
+                terminal_process = subprocess.Popen(['osascript', '-e', command])
+            print(f"Launched '{npm_command}' in a new Terminal window (macOS).")
+            process_launched = True
+        except Exception as e:
+            print(f"Error launching process on macOS: {e}")
+            print("Please ensure 'osascript' and 'Terminal.app' are available.")
+
+    else: # Linux (attempts common terminal emulators)
+        # The full shell command string to execute *within* the new terminal
+        shell_cmd_in_terminal = f'cd {shlex.quote(working_dir)} && ( {terminal_command} ) && exec bash'
+
+        terminal_process = launch_linux_terminal(shell_cmd_in_terminal, npm_command)
+        process_launched = terminal_process is not None
+
+        if not process_launched:
+            print("\nCould not find a suitable terminal emulator on your system.")
+
+    return terminal_process if process_launched else None
+
+def poll_for_dev_server(fallback_url, busy_ports=None, timeout=None, stop=None, name=None):
+    """
+    Polls for a dev server at fallback_url, or with busy_ports (see
+    check_port_conflicts) on every port in DEV_PORTS as well (see
+    wait_for_dev_port), for up to timeout seconds (SERVER_CHECK_TIMEOUT by
+    default) or until the threading.Event 'stop' is set. name labels the
+    output of workspace apps.
+    Returns the URL the server answers at, or None.
+    """
+    with trace_span("poll", url=fallback_url, app=name) as span:
+        if busy_ports is None:
+            url = fallback_url if check_server_ready(fallback_url, timeout=timeout, stop=stop) else None
+        else:
+            url = wait_for_dev_port(fallback_url, busy_ports, timeout=timeout, label=f"[{name}] " if name else "", stop=stop)
+        span["ready"] = url is not None
+    return url
+
+def wait_for_banner_or_port(wait_for_banner, fallback_url, busy_ports=None, name=None, stopping=None):
+    """
+    Waits for a dev server's banner and polls for it (see poll_for_dev_server)
+    at the same time, so a server whose banner isn't recognised is found as
+    soon as it answers. wait_for_banner(stop) returns a tuple (url, exit_code)
+    like wait_for_dev_server_banner, and returns early once 'stop' is set
+    (when the polling has finished). A banner URL wins over the polled one.
+    Gives up once the threading.Event 'stopping' is set, if there is one.
+    Returns the URL the server is ready at, or None.
+    """
+    label = f"[{name}] " if name else ""
+    start = time.time()
+    stop_poll = threading.Event()
+    poll_done = threading.Event()
+    polled = {}
+
+    def poll():
+        try:
+            polled["url"] = poll_for_dev_server(fallback_url, busy_ports, stop=stop_poll, name=name)
+        finally:
+            poll_done.set()
+
+    threading.Thread(target=poll, daemon=True).start()
+    try:
+        with trace_span("wait_banner", app=name) as span:
+            banner_url, exit_code = wait_for_banner(poll_done)
+            span["url"] = banner_url
+        if stopping is not None and stopping.is_set():
+            return None
+        if banner_url:
+            stop_poll.set()
+            if confirm_server_listening(banner_url, timeout=max(0, SERVER_CHECK_TIMEOUT - (time.time() - start))):
+                return banner_url
+            return None
+        if exit_code is not None:
+            print(f"{label}The dev server exited with code {exit_code} before it was ready.")
+            return None
+        if not poll_done.is_set():
+            print(f"{label}No dev server banner recognised. Still polling for it...")
+        while not poll_done.wait(0.2):
+            if stopping is not None and stopping.is_set():
+                return None
+        return polled.get("url")
+    finally:
+        stop_poll.set()
+
+def wait_for_dev_server(log_path, fallback_url, terminal_process=None, busy_ports=None, name=None):
+    """
+    Waits for a dev server launched with get_terminal_command to become ready,
+    and records the URL it found in the server's state file.
+    With WATCH_DEV_SERVER_OUTPUT it follows the banner in its log while
+    polling (see wait_for_banner_or_port), otherwise it only polls
+    fallback_url. terminal_process is the process returned by
+    launch_in_new_terminal, if any. With busy_ports (see
+    check_port_conflicts), DEV_PORTS are polled as well (see wait_for_dev_port).
+    Returns the URL the server is ready at, or None.
+    """
+    if not WATCH_DEV_SERVER_OUTPUT:
+        url = poll_for_dev_server(fallback_url, busy_ports, name=name)
+    else:
+        def wait_for_banner(stop):
+            return wait_for_dev_server_banner(log_path, terminal_process=terminal_process, stop=stop)
+        url = wait_for_banner_or_port(wait_for_banner, fallback_url, busy_ports, name)
+    if url:
+        print(f"{f'[{name}] ' if name else ''}Dev server is ready at {url}")
+        record_dev_server_url(get_state_path(log_path), url)
+    return url
+
+def open_browser(url):
+    """
+    Opens url in a new browser tab.
+    """
+    import webbrowser # Only needed once there is something to open, and slow to import
+    webbrowser.open_new_tab(url)
+
+def attach_to_running_server(log_path, label=""):
+    """
+    Opens the browser for a dev server that is already running for this log
+    path (see find_running_dev_server). Returns its state, or None if there is none.
+    """
+    with trace_span("reattach_check"):
+        state = find_running_dev_server(log_path)
+    if state is None:
+        return None
+    uptime = time.time() - state.get("started_at", time.time())
+    print(f"{label}A dev server for this project is already running at {state['url']} "
+          f"(PID {state['pid']}, up {uptime / 60:.0f} min). Re-using it instead of starting a new one.")
+    print(f"{label}Opening browser to {state['url']}...")
+    with trace_span("browser_open", url=state["url"]):
+        open_browser(state["url"])
+    return state
+
+# --- Headless supervised mode ---
+# Where no terminal window can be opened (SSH sessions, containers, shared dev
+# boxes), the launcher runs the dev server itself instead: its output is
+# streamed here with a "[name]" prefix, the last lines are kept in memory, a
+# crashed server is restarted with exponential backoff, and Ctrl-C / SIGTERM are
+# forwarded to the server's whole process group so nothing is left behind.
+
+def headless_service(name, cwd, npm_command, log_path, fallback_url, busy_ports=None):
+    """
+    Returns the description of one dev server for run_headless. busy_ports
+    are the ports that were taken before the launch (see wait_for_dev_server).
+    """
+    return {
+        "name": name,
+        "command": npm_command,
+        "cwd": cwd,
+        "log_path": log_path,
+        "fallback_url": fallback_url,
+        "busy_ports": busy_ports,
+    }
+
+def start_process_group(command, cwd):
+    """
+    Starts the dev command (see get_dev_command) in cwd as the leader of a new
+    process group (so signals reach everything it starts), with stdout and
+    stderr on one pipe. Returns the process.
+    Raises FileNotFoundError if the program of an argument list isn't on the PATH.
+    """
+    env = dict(os.environ)
+    if sys.stdout.isatty():
+        env["FORCE_COLOR"] = "1" # Output goes through a pipe now, ask the tools to keep their colours anyway
+    if platform.system() == "Windows":
+        group = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group = {"start_new_session": True}
+    # DEV_COMMAND goes through a shell, like in a terminal window; the package manager runs directly
+    return subprocess.Popen(**get_popen_arguments(command), cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, **group)
+
+def signal_process_group(process, signum):
+    """
+    Asks a process started by start_process_group and everything it started to stop.
+    """
+    try:
+        if platform.system() == "Windows":
+            process.send_signal(signal.CTRL_BREAK_EVENT) # The only signal a console process group receives
+        else:
+            os.killpg(process.pid, signum)
+    except OSError:
+        pass # Already gone
+
+def kill_process_tree(process):
+    """
+    Forcefully ends a process started by start_process_group together with
+    everything it started, including children that outlived it.
+    """
+    if platform.system() == "Windows":
+        if process.poll() is None:
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+def write_service_log(service, data):
+    """
+    Appends data to the service's log file, starting a new file (and keeping the
+    previous one as '<log>.1') once it grows past HEADLESS_LOG_MAX_BYTES.
+    """
+    log = service["log"]
+    if log.tell() > HEADLESS_LOG_MAX_BYTES:
+        log.close()
+        os.replace(service["log_path"], service["log_path"] + ".1")
+        log = service["log"] = open(service["log_path"], "wb")
+    log.write(data)
+    log.flush()
+
+def pump_supervised_output(service, process, recent, output_lock):
+    """
+    Forwards the output of one run of a service line by line with its prefix,
+    keeps it in the shared 'recent' ring buffer and in the service's log file,
+    and marks the service ready when its banner shows up.
+    """
+    prefix = f"[{service['name']}] "
+    pending = b"" # Output not yet scanned for the banner; None once it was found
+    for raw in iter(lambda: process.stdout.readline(65536), b""):
+        line = raw.decode("utf-8", "replace").rstrip("\r\n")
+        with output_lock:
+            sys.stdout.write(prefix + line + "\n")
+            sys.stdout.flush()
+            recent.append((service["name"], line))
+        write_service_log(service, raw)
+        if pending is not None:
+            url, pending = scan_output_for_banner(pending, raw, get_state_path(service["log_path"]), process.pid)
+            if url:
+                pending = None
+                service["url"] = url
+                service["ready"].set()
+
+def supervise_service(service, recent, output_lock, stopping, show_context=False, dependencies_ready=None):
+    """
+    Runs a service's command until it exits cleanly or 'stopping' is set,
+    restarting it with exponential backoff whenever it crashes. With
+    show_context, the service's last lines from the ring buffer are repeated
+    after a crash (useful when several services share the output). While
+    dependencies_ready (see watch_dependencies) is cleared, nothing is started.
+    Returns the last exit code.
+    """
+    name = service["name"]
+    delay = RESTART_INITIAL_DELAY
+    returncode = 0
+    while not stopping.is_set():
+        while dependencies_ready is not None and not dependencies_ready.wait(0.2) and not stopping.is_set():
+            pass # Dependencies are being reinstalled
+        if stopping.is_set():
+            break
+        started_at = time.time()
+        service["restart"] = False
+        try:
+            process = start_process_group(service["command"], service["cwd"])
+        except FileNotFoundError as e:
+            print(f"[{name}] Could not start '{format_command(service['command'])}': '{e.filename or e}' not found.")
+            return 127
+        except OSError as e:
+            print(f"[{name}] Could not start '{format_command(service['command'])}': {e}")
+            return 127
+        service["process"] = process
+        # Remember the server so the next launch can re-attach to it; the URL follows once it is found
+        write_dev_server_state(get_state_path(service["log_path"]), process.pid, None, started_at)
+        if stopping.is_set():
+            signal_process_group(process, signal.SIGTERM) # Stopped while we were starting it
+        elif dependencies_ready is not None and not dependencies_ready.is_set():
+            service["restart"] = True
+            signal_process_group(process, signal.SIGTERM) # Dependencies changed while we were starting it
+
+        pump = threading.Thread(target=pump_supervised_output, args=(service, process, recent, output_lock), daemon=True)
+        pump.start()
+        returncode = process.wait()
+        kill_process_tree(process) # Anything it left behind would keep the pipe (and the port) open
+        pump.join()
+        remove_dev_server_state(get_state_path(service["log_path"]), process.pid)
+        write_service_log(service, f"\n{EXIT_MARKER} {returncode}\n".encode())
+
+        if stopping.is_set():
+            break
+        if service["restart"]:
+            print(f"[{name}] Dev server stopped for the reinstall.")
+            delay = RESTART_INITIAL_DELAY
+            continue
+        if returncode == 0:
+            print(f"[{name}] Dev server exited normally; not restarting it.")
+            break
+
+        uptime = time.time() - started_at
+        if uptime >= RESTART_STABLE_AFTER:
+            delay = RESTART_INITIAL_DELAY # It ran fine for a while: this is a new crash, not a crash loop
+        with output_lock:
+            print(f"[{name}] Dev server crashed with code {returncode} after {uptime:.1f}s.")
+            if show_context:
+                for line in [line for owner, line in recent if owner == name][-HEADLESS_CRASH_CONTEXT:]:
+                    print(f"[{name}]   | {line}")
+            print(f"[{name}] Restarting in {delay:g}s (restart #{service['restarts'] + 1})...")
+        service["restarts"] += 1
+        if stopping.wait(delay):
+            break
+        delay = min(delay * 2, RESTART_MAX_DELAY)
+    return returncode
+
+def open_browser_when_ready(service, stopping):
+    """
+    Waits until a supervised service is ready (its banner, or polling its
+    fallback URL at the same time, see wait_for_banner_or_port) and opens the
+    browser for it once.
+    """
+    name = service["name"]
+    if WATCH_DEV_SERVER_OUTPUT:
+        def wait_for_banner(stop):
+            # Waiting for the event also covers a crash and restart before the banner
+            deadline = time.time() + BANNER_WAIT_TIMEOUT
+            while not (service["ready"].wait(0.05) or stop.is_set() or stopping.is_set()) and time.time() < deadline:
+                pass
+            return service["url"], None
+        url = wait_for_banner_or_port(wait_for_banner, service["fallback_url"], service["busy_ports"], name, stopping)
+    else:
+        url = poll_for_dev_server(service["fallback_url"], service["busy_ports"], stop=stopping, name=name)
+
+    if stopping.is_set():
+        return
+    if url:
+        print(f"[{name}] Dev server is ready at {url}")
+        if service["process"] is not None:
+            record_dev_server_url(get_state_path(service["log_path"]), url, service["process"].pid)
+        prewarm_before_opening(url, f"[{name}] ")
+        if stopping.is_set():
+            return
+        print(f"[{name}] Opening browser to {url}...")
+        with trace_span("browser_open", url=url, app=name):
+            open_browser(url)
+    else:
+        print(f"[{name}] Dev server did not become ready. You might need to open the browser manually.")
+
+def run_headless(services, watch_dir=None):
+    """
+    Runs and supervises every service (see headless_service) in this terminal,
+    opening the browser for each as soon as it is ready, until they all exit
+    or Ctrl-C / SIGTERM stops them. A second Ctrl-C kills them immediately.
+    With watch_dir, its dependency files are watched (see watch_dependencies).
+    Returns the exit code for this script.
+    """
+    recent = collections.deque(maxlen=HEADLESS_LOG_LINES) # (name, line) pairs of all services
+    output_lock = threading.Lock()
+    stopping = threading.Event()
+    dependencies_ready = threading.Event()
+    dependencies_ready.set()
+    results = {}
+
+    for service in services:
+        create_log_dir(service["log_path"])
+        service.update(process=None, ready=threading.Event(), url=None, restarts=0, restart=False, log=open(service["log_path"], "wb"))
+
+    def forward_signal(signum, frame):
+        if stopping.is_set(): # Asked twice: stop waiting
+            for service in services:
+                if service["process"] is not None:
+                    kill_process_tree(service["process"])
+            return
+        stopping.set()
+        print(f"\nStopping the dev server{'s' if len(services) > 1 else ''} (press Ctrl-C again to kill immediately)...")
+        for service in services:
+            if service["process"] is not None:
+                signal_process_group(service["process"], signum)
+
+    def supervise(service):
+        results[service["name"]] = supervise_service(service, recent, output_lock, stopping, len(services) > 1, dependencies_ready)
+
+    handled = [signal.SIGINT, signal.SIGTERM] + [getattr(signal, name) for name in ("SIGHUP", "SIGBREAK") if hasattr(signal, name)]
+    previous_handlers = {signum: signal.signal(signum, forward_signal) for signum in handled}
+    what = f"'{format_command(services[0]['command'])}'" if len(services) == 1 else f"{len(services)} dev servers"
+    print(f"Running {what} headless in this terminal. Press Ctrl-C to stop.")
+    try:
+        supervisors = [threading.Thread(target=supervise, args=(service,), daemon=True) for service in services]
+        for thread in supervisors:
+            thread.start()
+        for service in services:
+            threading.Thread(target=open_browser_when_ready, args=(service, stopping), daemon=True).start()
+        if watch_dir:
+            threading.Thread(target=watch_dependencies, args=(watch_dir, services, dependencies_ready, stopping), daemon=True).start()
+
+        while any(thread.is_alive() for thread in supervisors) and not stopping.wait(0.2):
+            pass
+        # Give the servers STOP_TIMEOUT seconds to shut down, then take them down by force
+        deadline = time.time() + STOP_TIMEOUT
+        for thread in supervisors:
+            thread.join(max(0, deadline - time.time()))
+        for service in services:
+            if service["process"] is not None and service["process"].poll() is None:
+                print(f"[{service['name']}] Did not stop within {STOP_TIMEOUT}s, killing it.")
+                kill_process_tree(service["process"])
+        for thread in supervisors:
+            thread.join()
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+        for service in services:
+            service["log"].close()
+
+    if stopping.is_set():
+        return 0
+    return max(results.values(), default=0)
+
+# --- Dependency watching ---
+# With WATCH_DEPENDENCIES, headless mode keeps an eye on package.json and the
+# lockfile while the dev server runs (e.g. for 'git pull' or a branch switch).
+# On Linux, inotify watches the directories that hold them (editors and git
+# replace files rather than rewriting them), so an idle watch costs nothing;
+# elsewhere their stat data is compared every WATCH_POLL_INTERVAL seconds.
+
+# inotify event masks (see <sys/inotify.h>)
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+INOTIFY_EVENT = struct.Struct("iIII") # wd, mask, cookie, len; followed by the file name
+
+def get_dependency_files(project_dir):
+    """
+    Returns the absolute paths of the files that decide what gets installed:
+    DEPENDENCY_FILES and the package.json of every workspace package.
+    """
+    paths = [os.path.join(project_dir, name) for name in DEPENDENCY_FILES]
+    return paths + [os.path.join(d, "package.json") for d in find_workspace_dirs(project_dir)]
+
+def open_inotify(directories):
+    """
+    Watches each of directories for files being written, moved or deleted.
+    Returns a tuple (inotify file descriptor, {watch descriptor: directory}),
+    or (None, None) where inotify isn't available.
+    """
+    if platform.system() != "Linux":
+        return None, None
+    import ctypes # Only needed for inotify
+    try:
+        libc = ctypes.CDLL(None, use_errno=True) # libc is already loaded into the interpreter
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None, None
+    if fd < 0:
+        return None, None
+    watches = {}
+    for directory in directories:
+        wd = libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE)
+        if wd < 0: # e.g. fs.inotify.max_user_watches reached
+            os.close(fd)
+            return None, None
+        watches[wd] = directory
+    return fd, watches
+
+def start_dependency_watch(project_dir):
+    """
+    Starts watching the project's dependency files (see get_dependency_files).
+    Returns the watch state for wait_for_dependency_change.
+    """
+    paths = get_dependency_files(project_dir)
+    fd, watches = open_inotify(sorted(set(os.path.dirname(path) for path in paths)))
+    return {
+        "project_dir": project_dir,
+        "paths": set(paths),
+        "fd": fd,
+        "watches": watches,
+        "stats": {path: stat_signature(path) for path in paths}, # For polling
+    }
+
+def stop_dependency_watch(watch):
+    """
+    Releases the inotify descriptor of a watch, if it has one.
+    """
+    if watch["fd"] is not None:
+        os.close(watch["fd"])
+        watch["fd"] = None
+
+def read_dependency_changes(watch, timeout):
+    """
+    Waits up to timeout seconds for changes to the watched files.
+    Returns the set of paths that changed (possibly empty).
+    """
+    changed = set()
+    if watch["fd"] is None:
+        time.sleep(timeout)
+        for path in watch["paths"]: # One stat per file per interval
+            signature = stat_signature(path)
+            if signature != watch["stats"][path]:
+                watch["stats"][path] = signature
+                changed.add(path)
+        return changed
+
+    readable, _, _ = select.select([watch["fd"]], [], [], timeout)
+    if not readable:
+        return changed
+    try:
+        data = os.read(watch["fd"], 65536)
+    except BlockingIOError:
+        return changed
+    offset = 0
+    while offset + INOTIFY_EVENT.size <= len(data):
+        wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+        name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b"\0")
+        offset += INOTIFY_EVENT.size + length
+        path = os.path.join(watch["watches"].get(wd, ""), os.fsdecode(name))
+        if path in watch["paths"]:
+            changed.add(path)
+    return changed
+
+def wait_for_dependency_change(watch, stopping):
+    """
+    Blocks until a watched file changes, then keeps collecting changes until
+    none arrived for WATCH_DEBOUNCE seconds (a 'git checkout' writes
+    package.json and the lockfile one after the other).
+    Returns the sorted names of the changed files, or [] once stopping is set.
+    """
+    changed = set()
+    quiet_since = None
+    while not stopping.is_set():
+        if quiet_since is None:
+            timeout = 1 if watch["fd"] is not None else WATCH_POLL_INTERVAL # inotify: just to notice 'stopping'
+        else:
+            timeout = quiet_since + WATCH_DEBOUNCE - time.monotonic()
+            if timeout <= 0:
+                return sorted(os.path.relpath(path, watch["project_dir"]).replace(os.sep, "/") for path in changed)
+            timeout = min(timeout, WATCH_POLL_INTERVAL)
+        new_changes = read_dependency_changes(watch, timeout)
+        if new_changes:
+            changed |= new_changes
+            quiet_since = time.monotonic()
+    return []
+
+def stop_services_for_restart(services):
+    """
+    Stops the supervised dev servers so they can be restarted, giving them
+    STOP_TIMEOUT seconds before killing them. Their supervisors wait for
+    'dependencies_ready' before starting them again.
+    """
+    for service in services:
+        service["restart"] = True
+        if service["process"] is not None and service["process"].poll() is None:
+            signal_process_group(service["process"], signal.SIGTERM)
+    deadline = time.time() + STOP_TIMEOUT
+    for service in services:
+        if service["process"] is None:
+            continue
+        try:
+            service["process"].wait(max(0, deadline - time.time()))
+        except subprocess.TimeoutExpired:
+            print(f"[{service['name']}] Did not stop within {STOP_TIMEOUT}s, killing it.")
+            kill_process_tree(service["process"])
+
+def watch_dependencies(project_dir, services, dependencies_ready, stopping):
+    """
+    Runs alongside run_headless: whenever the project's dependency files change,
+    stops the dev servers, installs what is needed (check_and_run_npm_install)
+    and lets the supervisors start them again. Returns once stopping is set.
+    """
+    watch = start_dependency_watch(project_dir)
+    names = sorted(os.path.relpath(path, project_dir).replace(os.sep, "/") for path in watch["paths"] if os.path.exists(path))
+    how = "inotify" if watch["fd"] is not None else f"checked every {WATCH_POLL_INTERVAL:g}s"
+    print(f"Watching {', '.join(names)} for changes ({how}).")
+    try:
+        while True:
+            changed = wait_for_dependency_change(watch, stopping)
+            if not changed or stopping.is_set():
+                return
+            is_fresh, reason = check_dependencies_fresh(project_dir)
+            if is_fresh:
+                continue # Saved without changes, or an install rewrote the lockfile
+
+            print(f"\n{', '.join(changed)} changed ({reason}). Reinstalling and restarting the dev server...")
+            with trace_span("dependency_change", files=changed):
+                dependencies_ready.clear()
+                stop_services_for_restart(services)
+                if stopping.is_set():
+                    return
+                if not check_and_run_npm_install(project_dir):
+                    print("Restarting the dev server with the current node_modules. Save the file again to retry the install.")
+                # The install may have rewritten the lockfile, and the workspaces may have changed
+                stop_dependency_watch(watch)
+                watch = start_dependency_watch(project_dir)
+                dependencies_ready.set()
+    finally:
+        stop_dependency_watch(watch)
+        dependencies_ready.set()
+
+# --- Pre-flight checks ---
+# The checks before a launch don't depend on each other, so they all start at
+# once on a small thread pool. The install only waits for the checks it needs;
+# the port and terminal checks finish alongside it and are only waited for
+# when the dev server is about to be spawned. The first failure ends the
+# launch with one report of everything found so far.
+
+# Checks that only the dev server spawn has to wait for
+SPAWN_CHECKS = ["port", "terminal"]
+
+def check_package_json(project_dir):
+    """
+    Pre-flight check: package.json exists, parses and has a "dev" script
+    (unless DEV_COMMAND or LAUNCH_WORKSPACES makes that unnecessary).
+    Returns a tuple (status, detail, value) like every pre-flight check, with
+    status "ok", "warn" or "fail".
+    """
+    path = os.path.join(project_dir, "package.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            package = json.load(f)
+    except FileNotFoundError:
+        return "fail", f"'{path}' not found. This doesn't seem to be a Node.js project", None
+    except (OSError, ValueError) as e:
+        return "fail", f"can't be read: {e}", None
+    scripts = package.get("scripts") if isinstance(package, dict) else None
+    dev_script = scripts.get("dev") if isinstance(scripts, dict) else None
+    if DEV_COMMAND:
+        return "ok", f"dev server command: {DEV_COMMAND}", package
+    if dev_script:
+        return "ok", f"'dev' script: {dev_script}", package
+    if LAUNCH_WORKSPACES:
+        return "ok", "no 'dev' script of its own (workspaces)", package
+    return "fail", "has no 'dev' script. Add one under \"scripts\" or set \"command\" in dev-starter.json", package
+
+def load_toolchain(project_dir):
+    """
+    Looks up node and the package manager once for all pre-flight checks
+    (see get_toolchain), reusing the versions in the install fingerprint
+    while the tools are unchanged.
+    """
+    with trace_span("toolchain"):
+        return get_toolchain(project_dir, load_dependency_fingerprint(project_dir))
+
+def check_tool(tool, toolchain):
+    """
+    Pre-flight check: tool (node or the package manager) is on the PATH.
+    Reports its version. toolchain returns the shared result of load_toolchain.
+    """
+    entry = toolchain().get(tool)
+    if entry is None:
+        if tool in ("node", "npm"):
+            return "fail", "not found on the PATH. Install Node.js from https://nodejs.org/", None
+        return "fail", f"not found on the PATH. Install it (e.g. 'corepack enable' or 'npm install -g {tool}')", None
+    version = entry["version"]
+    return "ok", version or "version unknown", version
+
+def check_dependencies(project_dir, install, toolchain):
+    """
+    Pre-flight check: node_modules is up to date (see check_dependencies_fresh).
+    Never fails: with install the install step acts on (and reports) the
+    result, without it a stale node_modules is a warning. toolchain returns
+    the shared result of load_toolchain.
+    """
+    is_fresh, reason = check_dependencies_fresh(project_dir, toolchain())
+    if install:
+        return "ok", None, (is_fresh, reason)
+    if is_fresh:
+        return "ok", "up to date", (is_fresh, reason)
+    return "warn", f"{reason}. Run 'dev-starter install-and-run' to install them", (is_fresh, reason)
+
+def check_port(port):
+    """
+    Pre-flight check: port is free (see scan_dev_ports). The value is the set of taken ports.
+    """
+    busy = scan_dev_ports(port)
+    if port in busy:
+        return "warn", f"{port} is already in use by {describe_port_owner(port)}", busy
+    return "ok", f"{port} is free", busy
+
+def check_terminal():
+    """
+    Pre-flight check: a terminal window can be opened (see get_terminal_problem).
+    The value is the problem, if any.
+    """
+    problem = get_terminal_problem()
+    if problem:
+        return "warn", f"no terminal window can be opened here ({problem}). Running headless instead", problem
+    return "ok", None, None
+
+def run_preflight_check(name, check, *args):
+    """
+    Runs one pre-flight check, turning an unexpected error into a failure.
+    """
+    with trace_span("preflight", check=name) as span:
+        try:
+            result = check(*args)
+        except Exception as e:
+            result = ("fail", f"check failed unexpectedly: {e}", None)
+        span["status"] = result[0]
+    return result
+
+def start_preflight_checks(project_dir, install, headless):
+    """
+    Starts every pre-flight check that applies to this launch at once.
+    Returns a dictionary {check name: future of its (status, detail, value)}.
+    """
+    import concurrent.futures # Only needed once a launch starts
+    manager = detect_package_manager(project_dir)
+    # node and the package manager are looked up once (their versions take a
+    # process each) for both the tool checks and the dependency check
+    def toolchain():
+        return toolchain_future.result()
+    checks = {"package.json": (check_package_json, project_dir)}
+    if manager != "bun": # Bun runs the dev server without Node.js
+        checks["node"] = (check_tool, "node", toolchain)
+    if install or not DEV_COMMAND:
+        checks[manager] = (check_tool, manager, toolchain)
+    checks["dependencies"] = (check_dependencies, project_dir, install, toolchain)
+    if CHECK_PORT_CONFLICTS and not LAUNCH_WORKSPACES: # Workspace apps check their own ports
+        checks["port"] = (check_port, LOCALHOST_PORT)
+    if not headless and HEADLESS_FALLBACK:
+        checks["terminal"] = (check_terminal,)
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(checks) + 1)
+    toolchain_future = executor.submit(load_toolchain, project_dir) # Submitted first, so it never waits for a free worker
+    futures = {name: executor.submit(run_preflight_check, name, *check) for name, check in checks.items()}
+    executor.shutdown(wait=False)
+    return futures
+
+def wait_for_preflight_checks(checks, names):
+    """
+    Waits for the named checks (those that were started) and prints their
+    results. Stops at the first failure and prints one report of every
+    check instead, finished or not.
+    Returns a dictionary {check name: value} of the named checks, or None if one failed.
+    """
+    import concurrent.futures # Only needed once a launch starts
+    pending = {checks[name]: name for name in names if name in checks}
+    results = {}
+    while pending:
+        done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            results[pending.pop(future)] = future.result()
+        if any(status == "fail" for status, _, _ in results.values()):
+            break
+
+    failed = [name for name, (status, _, _) in results.items() if status == "fail"]
+    for name, future in checks.items():
+        if failed:
+            status, detail, _ = future.result() if future.done() else ("...", "not finished", None)
+        elif name in results:
+            status, detail, _ = results[name]
+        else:
+            continue
+        if detail:
+            print(f"Pre-flight {status.upper():<4} {name}: {detail}")
+    if failed:
+        print(f"\nPre-flight check{'s' if len(failed) > 1 else ''} failed: {', '.join(failed)}. Not launching the dev server.")
+        return None
+    return {name: value for name, (_, _, value) in results.items()}
+
+def run_npm_dev_and_open_browser(project_dir, install=True):
+    """
+    Starts the dev server of the project in project_dir (installing its
+    dependencies first if install is set) and opens it in the browser.
+    """
+    # 1. Change to the project directory
+    print(f"Changing directory to: {project_dir}")
+    os.chdir(project_dir)
+
+    # Re-attach to a dev server that is already running for this project
+    if REUSE_RUNNING_SERVER and attach_to_running_server(DEV_LOG_PATH):
+        return
+
+    headless = HEADLESS
+    if WATCH_DEPENDENCIES and not headless:
+        print("Watching the dependencies needs the dev server to run in this terminal. Running headless.")
+        headless = True
+    watch_dir = project_dir if WATCH_DEPENDENCIES else None
+
+    # 2. Pre-flight checks, all at once; the install only waits for the ones it needs
+    checks = start_preflight_checks(project_dir, install, headless)
+    results = wait_for_preflight_checks(checks, [name for name in checks if name not in SPAWN_CHECKS])
+    if results is None:
+        print("Please resolve the issue before running this script again.")
+        print(f"This terminal (where you ran the Python script) will now close in {CLOSING_PAUSE:g} seconds...")
+        time.sleep(CLOSING_PAUSE)
+        sys.exit(1)
+
+    # 3. Check and run 'npm install'
+    if install and not check_and_run_npm_install(project_dir, results["dependencies"]):
+        print("\n'npm install' step failed or was skipped due to an error.")
+        print("Please resolve the issue before running this script again.")
+        print(f"This terminal (where you ran the Python script) will now close in {CLOSING_PAUSE:g} seconds...")
+        time.sleep(CLOSING_PAUSE)
+        sys.exit(1) # Exit if npm install failed
+
+    # --- From here, the program is "built" (dependencies installed) ---
+
+    # Without a terminal window to open, run the dev server right here
+    spawn_results = wait_for_preflight_checks(checks, SPAWN_CHECKS)
+    if spawn_results is None:
+        print(f"This terminal (where you ran the Python script) will now close in {CLOSING_PAUSE:g} seconds...")
+        time.sleep(CLOSING_PAUSE)
+        sys.exit(1)
+    results.update(spawn_results)
+    if results.get("terminal"):
+        headless = True
+
+    if LAUNCH_WORKSPACES:
+        apps = find_workspace_apps(project_dir)
+        if apps:
+            workspace_command = get_dev_command(detect_package_manager(project_dir))
+            if headless:
+                sys.exit(run_headless_workspaces(project_dir, apps, workspace_command, watch_dir))
+            results = run_workspace_dev_servers(project_dir, apps, workspace_command)
+            ready = sum(1 for url in results.values() if url)
+            print("\n--------------------------------------------------------------")
+            print(f"The Python script has finished its task ({ready}/{len(apps)} apps ready).")
+            print(f"This terminal (where you ran the Python script) will now close in {CLOSING_PAUSE:g} seconds...")
+            print("--------------------------------------------------------------")
+            time.sleep(CLOSING_PAUSE)
+            return
+        print("No workspace packages with a 'dev' script found. Launching the root project instead.")
+
+    manager = detect_package_manager(project_dir)
+    npm_command = get_dev_command(manager)
+    localhost_url = f"http://localhost:{LOCALHOST_PORT}/"
+
+    # Find out whether something else already holds the port before the dev server runs into it
+    busy_ports = None
+    if CHECK_PORT_CONFLICTS:
+        busy_ports, free_port = check_port_conflicts(LOCALHOST_PORT, busy=results.get("port"))
+        port_command = add_port_argument(npm_command, free_port) if free_port else None
+        if free_port and port_command is None:
+            print(f"Can't tell where to pass '--port {free_port}' in '{format_command(npm_command)}'. "
+                  f"Keeping port {LOCALHOST_PORT}; add the port to the command yourself to change it.")
+        elif free_port:
+            npm_command = port_command
+            os.environ["PORT"] = str(free_port) # For dev servers that read their port from the environment (Create React App)
+            localhost_url = f"http://localhost:{free_port}/"
+            print(f"Using free port {free_port} instead: '{format_command(npm_command)}'")
+
+    if headless:
+        sys.exit(run_headless([headless_service("dev", project_dir, npm_command, DEV_LOG_PATH, localhost_url, busy_ports)], watch_dir))
+
+    terminal_command = get_terminal_command(npm_command, DEV_LOG_PATH)
+
+    print(f"Attempting to launch '{format_command(npm_command)}' in a new terminal...")
+    print(f"Expecting server to run on: {localhost_url}")
+
+    # 4. Launch 'npm run dev' in a new terminal window
+    terminal_process = launch_in_new_terminal(project_dir, terminal_command, format_command(npm_command))
+
+    if terminal_process is None:
+        if HEADLESS_FALLBACK:
+            print("Running it headless in this terminal instead.")
+            sys.exit(run_headless([headless_service("dev", project_dir, npm_command, DEV_LOG_PATH, localhost_url, busy_ports)], watch_dir))
+        print(f"Please run '{format_command(npm_command)}' manually in your project folder ({project_dir}).")
+        print(f"Failed to launch '{format_command(npm_command)}' process. Cannot proceed with browser opening.")
+        print(f"This terminal (where you ran the Python script) will now close in {CLOSING_PAUSE:g} seconds...")
+        time.sleep(CLOSING_PAUSE)
+        sys.exit(1) # Exit if the subprocess didn't launch for any reason
+
+    # --- 5. Server readiness check and browser opening ---
+    ready_url = wait_for_dev_server(DEV_LOG_PATH, localhost_url, terminal_process, busy_ports)
+    if ready_url:
+        localhost_url = ready_url
+        prewarm_before_opening(localhost_url)
+        print(f"Opening browser to {localhost_url}...")
+        with trace_span("browser_open", url=localhost_url):
+            open_browser(localhost_url)
+    else:
+        print(f"Server did not become ready at {localhost_url} within {SERVER_CHECK_TIMEOUT} seconds.")
+        print("Please check the new terminal for errors or if the server started on a different port.")
+        print("You might need to open the browser manually once the server is ready.")
+
+    print("\n--------------------------------------------------------------")
+    print("The Python script has finished its task.")
+    print(f"A new terminal should have opened running '{format_command(npm_command)}'.")
+    print(f"This terminal (where you ran the Python script) will now close in {CLOSING_PAUSE:g} seconds...")
+    print("--------------------------------------------------------------")
+    with trace_span("closing_pause"):
+        time.sleep(CLOSING_PAUSE) # Give user time to read output before this script's terminal closes
@@ -0,0 +1,84 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from dev_starter import __version__, cli
+
+# --- Command line and config file ---
+# load_config / convert_setting check dev-starter.json before anything is
+# started; the shims run.py and run2.py pass their arguments on to 'dev-starter'.
+#
+#   python -m pytest tests/test_cli.py
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def write_config(project_dir, config):
+    """
+    Writes config (JSON-encoded, or as is for a string) to the project's config file.
+    """
+    with open(os.path.join(project_dir, cli.CONFIG_FILE), "w", encoding="utf-8") as f:
+        f.write(config if isinstance(config, str) else json.dumps(config))
+
+def test_load_config_without_file(tmp_path):
+    assert cli.load_config(str(tmp_path)) == {}
+
+def test_load_config_maps_keys_to_launcher_settings(tmp_path):
+    write_config(str(tmp_path), {"port": 3000, "command": "pnpm dev", "timeout": 90, "headless": True, "prewarm_workers": 4})
+    assert cli.load_config(str(tmp_path)) == {
+        "LOCALHOST_PORT": 3000,
+        "DEV_COMMAND": "pnpm dev",
+        "SERVER_CHECK_TIMEOUT": 90.0,
+        "HEADLESS": True,
+        "PREWARM_WORKERS": 4,
+    }
+
+def test_load_config_accepts_null_command(tmp_path):
+    write_config(str(tmp_path), {"command": None})
+    assert cli.load_config(str(tmp_path)) == {"DEV_COMMAND": None}
+
+@pytest.mark.parametrize("config, message", [
+    ({"prot": 3000}, "Unknown setting 'prot'"),
+    ({"port": "3000"}, "'port' must be int, not \"3000\""),
+    ({"port": True}, "'port' must be int, not true"),
+    ({"headless": 1}, "'headless' must be bool, not 1"),
+    ([1, 2], "must contain a JSON object"),
+    ("{port: 3000}", "Could not read"),
+])
+def test_load_config_rejects_invalid_files(tmp_path, config, message):
+    write_config(str(tmp_path), config)
+    with pytest.raises(cli.ConfigError, match=re.escape(message)):
+        cli.load_config(str(tmp_path))
+
+@pytest.mark.parametrize("value_type, value, expected", [
+    (float, 5, 5.0),
+    (float, 2.5, 2.5),
+    (int, 8, 8),
+    (str, None, None),
+    (bool, False, False),
+])
+def test_convert_setting(value_type, value, expected):
+    converted = cli.convert_setting("key", value_type, value)
+    assert converted == expected and type(converted) is type(expected)
+
+@pytest.mark.parametrize("value_type, value", [(float, True), (int, 2.5), (bool, None), (str, 3)])
+def test_convert_setting_rejects_wrong_types(value_type, value):
+    with pytest.raises(cli.ConfigError):
+        cli.convert_setting("key", value_type, value)
+
+@pytest.mark.parametrize("argv", [["--version"], ["run", "--version"], ["install-and-run", "-C", ".", "--version"]])
+def test_version_before_and_after_the_subcommand(argv, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(argv)
+    assert exit_info.value.code == 0
+    assert capsys.readouterr().out.strip() == f"dev-starter {__version__}"
+
+@pytest.mark.parametrize("shim", ["run.py", "run2.py"])
+def test_shims_pass_options_on(shim):
+    result = subprocess.run([sys.executable, shim, "--version"], cwd=ROOT_DIR, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == f"dev-starter {__version__}"
@@ -0,0 +1,82 @@
+import compileall
+import json
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+# --- Import budget ---
+# The 'dev-starter' command should only import what the chosen path needs:
+# argument parsing and the config file are handled before the launcher module
+# is loaded, and the browser, hashing, monorepo and TLS modules are imported
+# only when used.
+#
+#   python -m pytest tests/test_import_budget.py
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules each module must not import at all (the deterministic part)
+IMPORT_FORBIDDEN = {
+    "dev_starter.cli": ["dev_starter.launcher", "subprocess", "socket", "webbrowser", "concurrent.futures", "hashlib", "ssl"],
+    "dev_starter.launcher": ["webbrowser", "concurrent.futures", "hashlib", "glob", "ssl", "http.client", "urllib.request"],
+}
+
+# Cumulative import time budgets in milliseconds, for the best of
+# IMPORT_BUDGET_RUNS runs of 'python -X importtime' with compiled bytecode.
+# Typically measured: cli ~15-20 ms, launcher ~35-55 ms; the budgets leave room
+# for slow or busy machines and only catch a heavy new import.
+IMPORT_BUDGETS = {
+    "dev_starter.cli": 50,
+    "dev_starter.launcher": 120,
+}
+IMPORT_BUDGET_RUNS = 5
+
+# ---------------------
+
+@pytest.fixture(scope="module", autouse=True)
+def compiled_bytecode():
+    """
+    Compiles the package first, so no measurement includes compiling it.
+    """
+    compileall.compile_dir(os.path.join(ROOT_DIR, "dev_starter"), quiet=1)
+
+def run_python(*args):
+    """
+    Runs a fresh interpreter in the repository root. Returns the finished process.
+    """
+    return subprocess.run([sys.executable] + list(args), cwd=ROOT_DIR, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+def imported_modules(module):
+    """
+    Returns the names of the modules that importing module loads, beyond what
+    the interpreter had already loaded at startup.
+    """
+    code = f"import json, sys; before = set(sys.modules); import {module}; print(json.dumps(sorted(set(sys.modules) - before)))"
+    return json.loads(run_python("-c", code).stdout)
+
+def measure_import_time(module):
+    """
+    Imports module in a fresh interpreter with '-X importtime'. Returns its
+    cumulative import time in milliseconds.
+    """
+    stderr = run_python("-X", "importtime", "-c", f"import {module}").stderr
+    for line in stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        match = re.match(r"import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*(\S+)$", line)
+        if match and match.group(2) == module:
+            return int(match.group(1)) / 1000
+    raise AssertionError(f"no import time reported for {module}")
+
+@pytest.mark.parametrize("module", sorted(IMPORT_FORBIDDEN))
+def test_no_forbidden_imports(module):
+    loaded = imported_modules(module)
+    assert module in loaded
+    assert [name for name in IMPORT_FORBIDDEN[module] if name in loaded] == []
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+def test_import_time_within_budget(module):
+    best = min(measure_import_time(module) for _ in range(IMPORT_BUDGET_RUNS)) # Least disturbed by other load
+    assert best <= IMPORT_BUDGETS[module], f"importing {module} took {best:.1f} ms (budget {IMPORT_BUDGETS[module]} ms)"
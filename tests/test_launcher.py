@@ -0,0 +1,273 @@
+import json
+import os
+import sys
+
+import pytest
+
+from dev_starter import launcher
+
+# --- Launcher logic ---
+# Behaviour of the launcher's pure logic: banner parsing, the dependency
+# fingerprint, the install strategy, workspace discovery and the port option.
+# Nothing here starts a process or opens a socket.
+#
+#   python -m pytest tests/test_launcher.py
+
+# Toolchain entries for compute_dependency_fingerprint, so no tool is run
+NO_TOOLS = {"node": None, "npm": None}
+
+def write_json(path, data):
+    """
+    Writes data as JSON to path, creating its directory.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def lockfile(*packages, **options):
+    """
+    Returns a package-lock.json (lockfileVersion 3) locking each name at 1.0.0.
+    Keyword arguments are added to every package entry.
+    """
+    entries = {"": {"name": "app"}}
+    for name in packages:
+        entries[f"node_modules/{name}"] = dict({"version": "1.0.0"}, **options)
+    return {"name": "app", "lockfileVersion": 3, "packages": entries}
+
+# --- Banner detection (find_banner_url) ---
+
+@pytest.mark.parametrize("line, url", [
+    ("  \x1b[32m➜\x1b[39m  \x1b[1mLocal\x1b[22m:   \x1b[36mhttp://localhost:\x1b[1m5173\x1b[22m/\x1b[39m", "http://localhost:5173/"),
+    ("  - Local:        http://localhost:3000", "http://localhost:3000"),
+    ("ready - started server on 0.0.0.0:3000, url: http://localhost:3000", "http://localhost:3000"),
+    ("** Angular Live Development Server is listening on localhost:4200, open your browser on http://localhost:4200/ **", "http://localhost:4200/"),
+    ("  Local:   https://localhost:5173/", "https://localhost:5173/"),
+])
+def test_find_banner_url_recognises_dev_server_banners(line, url):
+    assert launcher.find_banner_url(line) == url
+
+@pytest.mark.parametrize("line", [
+    "  Network: use --host to expose",
+    "wait  - compiling /page, url: http://localhost:3000/page",
+    "Local: localhost:5173",
+    "",
+])
+def test_find_banner_url_ignores_other_lines(line):
+    assert launcher.find_banner_url(line) is None
+
+def test_scan_output_for_banner_joins_lines_split_across_chunks(tmp_path):
+    state_path = str(tmp_path / "dev-server.json")
+    launcher.write_dev_server_state(state_path, 42, None, 0)
+    url, pending = launcher.scan_output_for_banner(b"", b"VITE ready\n  Local:   http://local", state_path, 42)
+    assert url is None
+    url, pending = launcher.scan_output_for_banner(pending, b"host:5174/\n", state_path, 42)
+    assert url == "http://localhost:5174/"
+    assert launcher.load_dev_server_state(state_path)["port"] == 5174
+
+# --- Dependency fingerprint (hidden_lockfile_matches, check_dependencies_fresh) ---
+
+def test_hidden_lockfile_matches_without_lockfile(tmp_path):
+    assert launcher.hidden_lockfile_matches(str(tmp_path))
+
+def test_hidden_lockfile_matches_an_identical_install(tmp_path):
+    write_json(str(tmp_path / "package-lock.json"), lockfile("react", "vite"))
+    write_json(str(tmp_path / "node_modules" / ".package-lock.json"), lockfile("react", "vite"))
+    assert launcher.hidden_lockfile_matches(str(tmp_path))
+
+def test_hidden_lockfile_mismatches_a_partial_install(tmp_path):
+    write_json(str(tmp_path / "package-lock.json"), lockfile("react", "vite"))
+    write_json(str(tmp_path / "node_modules" / ".package-lock.json"), lockfile("react"))
+    assert not launcher.hidden_lockfile_matches(str(tmp_path))
+
+def test_hidden_lockfile_ignores_skipped_optional_packages(tmp_path):
+    lock = lockfile("react")
+    lock["packages"]["node_modules/fsevents"] = {"version": "2.3.3", "optional": True}
+    write_json(str(tmp_path / "package-lock.json"), lock)
+    write_json(str(tmp_path / "node_modules" / ".package-lock.json"), lockfile("react"))
+    assert launcher.hidden_lockfile_matches(str(tmp_path))
+
+def test_hidden_lockfile_mismatches_another_version(tmp_path):
+    write_json(str(tmp_path / "package-lock.json"), lockfile("react"))
+    hidden = lockfile("react")
+    hidden["packages"]["node_modules/react"]["version"] = "2.0.0"
+    write_json(str(tmp_path / "node_modules" / ".package-lock.json"), hidden)
+    assert not launcher.hidden_lockfile_matches(str(tmp_path))
+
+def test_hidden_lockfile_missing_means_no_match(tmp_path):
+    write_json(str(tmp_path / "package-lock.json"), lockfile("react"))
+    assert not launcher.hidden_lockfile_matches(str(tmp_path))
+
+@pytest.fixture
+def installed_project(tmp_path):
+    """
+    A project whose last install was recorded in a fingerprint.
+    """
+    write_json(str(tmp_path / "package.json"), {"name": "app", "dependencies": {"react": "^18.0.0"}})
+    write_json(str(tmp_path / "package-lock.json"), lockfile("react"))
+    write_json(str(tmp_path / "node_modules" / ".package-lock.json"), lockfile("react"))
+    project_dir = str(tmp_path)
+    launcher.save_dependency_fingerprint(project_dir, launcher.compute_dependency_fingerprint(project_dir, toolchain=NO_TOOLS))
+    return project_dir
+
+def test_dependencies_not_fresh_without_node_modules(tmp_path):
+    write_json(str(tmp_path / "package.json"), {"name": "app"})
+    assert launcher.check_dependencies_fresh(str(tmp_path), NO_TOOLS) == (False, "node_modules directory not found")
+
+def test_dependencies_fresh_while_nothing_changed(installed_project):
+    assert launcher.check_dependencies_fresh(installed_project, NO_TOOLS) == (True, "fingerprint unchanged")
+
+def test_dependencies_not_fresh_after_package_json_changed(installed_project):
+    write_json(os.path.join(installed_project, "package.json"), {"name": "app", "dependencies": {"react": "^19.0.0"}})
+    assert launcher.check_dependencies_fresh(installed_project, NO_TOOLS) == (False, "package.json changed since the last install")
+
+def test_dependencies_fresh_after_touching_package_json(installed_project):
+    path = os.path.join(installed_project, "package.json")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9)) # Same content, new stat data
+    assert launcher.check_dependencies_fresh(installed_project, NO_TOOLS)[0]
+
+def test_dependencies_not_fresh_after_tool_version_changed(installed_project):
+    toolchain = dict(NO_TOOLS, node={"path": "/usr/bin/node", "stat": None, "version": "v22.0.0"})
+    assert launcher.check_dependencies_fresh(installed_project, toolchain) == (False, "node version changed (None -> v22.0.0)")
+
+def test_dependencies_without_fingerprint_trust_a_matching_install(installed_project):
+    os.remove(os.path.join(installed_project, "node_modules", launcher.FINGERPRINT_FILE))
+    assert launcher.check_dependencies_fresh(installed_project, NO_TOOLS) == (True, "node_modules matches the lockfile")
+    assert launcher.load_dependency_fingerprint(installed_project) is not None
+
+# --- Install strategy (choose_install_strategy) ---
+
+@pytest.fixture
+def no_ci(monkeypatch):
+    monkeypatch.delenv("CI", raising=False)
+    monkeypatch.setattr(launcher, "npm_cache_has_lockfile", lambda project_dir: False)
+
+def test_npm_without_lockfile_installs(tmp_path, no_ci):
+    assert launcher.choose_install_strategy(str(tmp_path), "npm") == ("no lockfile", ["npm", "install", "--no-audit", "--no-fund"], None)
+
+def test_npm_with_lockfile_and_fresh_node_modules_uses_ci(tmp_path, no_ci):
+    write_json(str(tmp_path / "package-lock.json"), lockfile("react"))
+    reason, command, fallback = launcher.choose_install_strategy(str(tmp_path), "npm")
+    assert command == ["npm", "ci", "--prefer-offline", "--no-audit", "--no-fund"]
+    assert fallback == ["npm", "install", "--prefer-offline", "--no-audit", "--no-fund"]
+    assert reason.endswith("fresh node_modules")
+
+def test_npm_with_existing_node_modules_installs_without_fallback(tmp_path, no_ci):
+    write_json(str(tmp_path / "npm-shrinkwrap.json"), lockfile("react"))
+    os.mkdir(str(tmp_path / "node_modules"))
+    _, command, fallback = launcher.choose_install_strategy(str(tmp_path), "npm")
+    assert command == ["npm", "install", "--prefer-offline", "--no-audit", "--no-fund"]
+    assert fallback is None
+
+def test_npm_goes_offline_when_the_cache_has_every_package(tmp_path, no_ci, monkeypatch):
+    write_json(str(tmp_path / "package-lock.json"), lockfile("react"))
+    os.mkdir(str(tmp_path / "node_modules"))
+    monkeypatch.setattr(launcher, "npm_cache_has_lockfile", lambda project_dir: True)
+    _, command, fallback = launcher.choose_install_strategy(str(tmp_path), "npm")
+    assert command == ["npm", "install", "--offline", "--no-audit", "--no-fund"]
+    assert fallback == ["npm", "install", "--prefer-offline", "--no-audit", "--no-fund"]
+
+def test_npm_on_ci_uses_ci_even_with_node_modules(tmp_path, no_ci, monkeypatch):
+    monkeypatch.setenv("CI", "true")
+    write_json(str(tmp_path / "package-lock.json"), lockfile("react"))
+    os.mkdir(str(tmp_path / "node_modules"))
+    assert launcher.choose_install_strategy(str(tmp_path), "npm")[1][:2] == ["npm", "ci"]
+
+@pytest.mark.parametrize("manager, ci, berry, command", [
+    ("pnpm", False, False, ["pnpm", "install", "--prefer-offline"]),
+    ("pnpm", True, False, ["pnpm", "install", "--prefer-offline", "--frozen-lockfile"]),
+    ("yarn", False, False, ["yarn", "install", "--prefer-offline"]),
+    ("yarn", True, False, ["yarn", "install", "--prefer-offline", "--frozen-lockfile"]),
+    ("yarn", True, True, ["yarn", "install", "--immutable"]),
+    ("bun", True, False, ["bun", "install", "--frozen-lockfile"]),
+])
+def test_other_package_managers(tmp_path, no_ci, monkeypatch, manager, ci, berry, command):
+    if ci:
+        monkeypatch.setenv("CI", "1")
+    if berry:
+        (tmp_path / ".yarnrc.yml").write_text("nodeLinker: node-modules\n")
+    _, chosen, fallback = launcher.choose_install_strategy(str(tmp_path), manager)
+    assert (chosen, fallback) == (command, None)
+
+# --- Workspaces (read_pnpm_workspace_patterns, find_dev_port) ---
+
+def test_read_pnpm_workspace_patterns(tmp_path):
+    (tmp_path / "pnpm-workspace.yaml").write_text(
+        "# Workspace packages\n"
+        "packages:\n"
+        "  - 'apps/*'\n"
+        "  - \"packages/**\" # nested too\n"
+        "  - '!**/test/**'\n"
+        "\n"
+        "catalog:\n"
+        "  - react\n"
+    )
+    assert launcher.read_pnpm_workspace_patterns(str(tmp_path)) == ["apps/*", "packages/**", "!**/test/**"]
+
+def test_read_pnpm_workspace_patterns_without_file(tmp_path):
+    assert launcher.read_pnpm_workspace_patterns(str(tmp_path)) == []
+
+@pytest.mark.parametrize("script, port", [
+    ("vite --port 3001", 3001),
+    ("next dev -p 4000", 4000),
+    ("vite --port=5000 --host", 5000),
+    ("vite", None),
+    (None, None),
+])
+def test_find_dev_port(script, port):
+    assert launcher.find_dev_port(script) == (launcher.LOCALHOST_PORT if port is None else port)
+
+# --- Port option (add_port_argument) ---
+
+@pytest.mark.parametrize("command, expected", [
+    ("npm run dev", "npm run dev -- --port 5174"),
+    ("npm run dev -- --host", "npm run dev -- --host --port 5174"),
+    ("pnpm run dev", "pnpm run dev --port 5174"),
+    ("yarn dev", "yarn dev --port 5174"),
+    ("vite", "vite --port 5174"),
+    ("cd web && npm run dev", "cd web && npm run dev -- --port 5174"),
+    ("cd web; pnpm dev", "cd web; pnpm dev --port 5174"),
+    ("npm run build && npm run dev | tee dev.log", "npm run build && npm run dev -- --port 5174 | tee dev.log"),
+    ("npm run dev 2>&1 | tee dev.log", "npm run dev -- --port 5174 2>&1 | tee dev.log"),
+    ("npm run dev >&2", "npm run dev -- --port 5174 >&2"),
+    ("npm run dev &> dev.log", "npm run dev -- --port 5174 &> dev.log"),
+    ("PORT=3001 npm run dev", "PORT=3001 npm run dev -- --port 5174"),
+    ("cd web && NODE_ENV=development pnpm dev > dev.log", "cd web && NODE_ENV=development pnpm dev --port 5174 > dev.log"),
+    ("vite --host '0.0.0.0'", "vite --host '0.0.0.0' --port 5174"),
+    (["npm", "run", "dev"], ["npm", "run", "dev", "--", "--port", "5174"]),
+    (["pnpm", "run", "dev"], ["pnpm", "run", "dev", "--port", "5174"]),
+])
+def test_add_port_argument(command, expected):
+    assert launcher.add_port_argument(command, 5174) == expected
+
+@pytest.mark.parametrize("command", [
+    "cd web && ./start.sh",
+    "(cd web && npm run dev)",
+    "echo `npm run dev`",
+    "PORT=3001",
+    "echo 'a && b' && npm run dev",
+    "npm run dev \"--mode=a|b\"",
+])
+def test_add_port_argument_refuses_when_unsure(command):
+    assert launcher.add_port_argument(command, 5174) is None
+
+# --- Output wrapper (tee_dev_server_output) ---
+# The default command is an argument list and runs without a shell;
+# DEV_COMMAND is a shell command line.
+
+@pytest.mark.parametrize("command", [
+    [sys.executable, "-c", "print('ready')"],
+    f"echo ready && {sys.executable} -c \"import sys; sys.exit(0)\"",
+])
+def test_tee_dev_server_output_runs_the_command(tmp_path, command):
+    log_path = str(tmp_path / "dev-server.log")
+    assert launcher.tee_dev_server_output(log_path, command) == 0
+    with open(log_path, encoding="utf-8") as f:
+        log = f.read()
+    assert "ready" in log and f"{launcher.EXIT_MARKER} 0" in log
+
+def test_tee_dev_server_output_without_the_program(tmp_path):
+    log_path = str(tmp_path / "dev-server.log")
+    assert launcher.tee_dev_server_output(log_path, ["no-such-package-manager", "run", "dev"]) == 127
+    with open(log_path, encoding="utf-8") as f:
+        assert f"{launcher.EXIT_MARKER} 127" in f.read()